@@ -1,8 +1,19 @@
 import streamlit as st
 import cv2
-import mediapipe as mp
-import numpy as np
-from streamlit_webrtc import webrtc_streamer, VideoProcessorBase, RTCConfiguration
+import av
+import threading
+import time
+from pathlib import Path
+import sys
+from streamlit_webrtc import webrtc_streamer, VideoProcessorBase, RTCConfiguration, WebRtcMode
+
+# Add the project root to the path to import custom models
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+from utils.engine_pool import engine_pool
+from config.settings import EXERCISE_CONFIG
 
 # Page config
 st.set_page_config(
@@ -11,40 +22,104 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize MediaPipe Pose
-mp_pose = mp.solutions.pose
-mp_drawing = mp.solutions.drawing_utils
-
 class VideoProcessor(VideoProcessorBase):
+    """Counts reps on WebRTC frames; the page reads counters through snapshot()"""
+
     def __init__(self):
-        self.pose = mp_pose.Pose(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            model_complexity=1
-        )
+        self.created = time.perf_counter()
+        self.first_frame_s = None
+        # recv runs on the WebRTC worker thread, the page polls from the script thread
+        self.lock = threading.Lock()
+        # Leased from the server-wide pool on the first frame (pre-warmed, so it
+        # doesn't pay for MediaPipe's start-up) and handed back when the stream
+        # ends; not here, which would hold up the WebRTC callback
+        self.lease = None
+        self.busy = False
+        self.exercise = 'Bicep Curls'
+        self.selected_hand = 'Right'
+        self.dropped_frames = 0
+
+    def set_options(self, exercise, selected_hand):
+        with self.lock:
+            self.exercise = exercise
+            self.selected_hand = selected_hand
+
+    @property
+    def engine_warm(self):
+        return self.lease is not None and self.lease.warm
+
+    def _lease(self, lease):
+        if lease is not None:
+            lease.on_release(self._wait_for_frame)
+        return lease
+
+    def _wait_for_frame(self):
+        # The pool may release the lease from its own thread; a recv still
+        # inside the engine finishes before the engine is handed back
+        with self.lock:
+            pass
+
+    def _engine(self):
+        # Lease again if the pool reclaimed ours (no frames for lease_timeout).
+        # Waits for an engine that is still being built; None only when the pool is full
+        if self.lease is None or not self.lease.touch():
+            self.lease = self._lease(engine_pool().lease(timeout=0))
+            self.busy = self.lease is None
+        return self.lease.engine if self.lease is not None else None
+
+    def reset_counter(self):
+        with self.lock:
+            if self.lease is not None and not self.lease.released:
+                self.lease.engine.counters[self.exercise].reset_counter()
+
+    def snapshot(self):
+        with self.lock:
+            state = {'counter': 0, 'stage': None, 'dropped_frames': self.dropped_frames,
+                     'first_frame_s': self.first_frame_s, 'busy': self.busy}
+            if self.lease is not None and not self.lease.released:
+                counter = self.lease.engine.counters[self.exercise]
+                state.update(counter=counter.counter, stage=counter.stage)
+            return state
 
     def recv(self, frame):
         img = frame.to_ndarray(format="bgr24")
-        
-        # Convert the BGR image to RGB
-        image = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        
-        # Process the image and detect poses
-        results = self.pose.process(image)
-        
-        # Draw the pose annotations on the image
-        if results.pose_landmarks:
-            mp_drawing.draw_landmarks(
+        # Mirror like the Workout page so hand selection means the same thing.
+        # The flipped copy is contiguous and ours, so overlays go straight onto it
+        img = cv2.flip(img, 1)
+
+        with self.lock:
+            engine = self._engine()
+            if engine is None:
+                # Every pooled engine is in use; pass the video through
+                return av.VideoFrame.from_ndarray(img, format="bgr24")
+            img = engine.process_frame(
                 img,
-                results.pose_landmarks,
-                mp_pose.POSE_CONNECTIONS,
-                mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
-                mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
+                active=[self.exercise],
+                options={self.exercise: {'selected_hand': self.selected_hand}},
+                in_place=True
             )
-        
-        return img
+            if self.first_frame_s is None:
+                self.first_frame_s = time.perf_counter() - self.created
+
+        return av.VideoFrame.from_ndarray(img, format="bgr24")
+
+    async def recv_queued(self, frames):
+        # streamlit-webrtc only processes the newest queued frame, which keeps
+        # latency bounded; count the ones it drops
+        with self.lock:
+            self.dropped_frames += len(frames) - 1
+        return await super().recv_queued(frames)
+
+    def on_ended(self):
+        # The stream stopped or the tab went away: give the engine back right away.
+        # Not under self.lock, which the release callback takes
+        lease = self.lease
+        if lease is not None:
+            lease.release()
 
 def main():
+    # Start building a warm pose engine while the user reads the page
+    engine_pool()
     st.title("AI Fitness Trainer 💪")
     
     col1, col2 = st.columns([3, 1])
@@ -58,7 +133,7 @@ def main():
         # Create WebRTC streamer
         ctx = webrtc_streamer(
             key="fitness-pose-detection",
-            mode=webrtc_streamer.WebRtcMode.SENDRECV,
+            mode=WebRtcMode.SENDRECV,
             rtc_configuration=rtc_configuration,
             video_processor_factory=VideoProcessor,
             media_stream_constraints={
@@ -72,6 +147,22 @@ def main():
             st.success("✅ Camera is running! Move around to test pose detection.")
     
     with col2:
+        exercise_type = st.radio("Choose Exercise:", options=list(EXERCISE_CONFIG))
+        selected_hand = None
+        if EXERCISE_CONFIG[exercise_type]['aggregate'] == 'selected':
+            sides = ['Left', 'Right', 'Both']
+            selected_hand = st.radio("Select Hand:", options=sides,
+                                     index=sides.index(EXERCISE_CONFIG[exercise_type]['default_side']))
+
+        if ctx.video_processor:
+            ctx.video_processor.set_options(exercise_type, selected_hand)
+            if st.button("Reset Counter", use_container_width=True):
+                ctx.video_processor.reset_counter()
+
+        reps_placeholder = st.empty()
+        stage_placeholder = st.empty()
+        first_frame_placeholder = st.empty()
+
         st.markdown("""
         ### Instructions
         1. Click 'START' to begin
@@ -92,5 +183,21 @@ def main():
         else:
             st.warning("Camera Status: Click START")
 
+    # Poll the processor's counters while the stream is live, sending only changes
+    last_state = None
+    while ctx.state.playing and ctx.video_processor:
+        state = ctx.video_processor.snapshot()
+        if last_state is None or state['counter'] != last_state['counter']:
+            reps_placeholder.metric("Reps", state['counter'])
+        if last_state is None or state['stage'] != last_state['stage']:
+            stage_placeholder.metric("Stage", state['stage'] or "-")
+        if state['busy'] and (last_state is None or not last_state['busy']):
+            first_frame_placeholder.warning("All pose engines are in use; counting starts when one frees up.")
+        elif state['first_frame_s'] is not None and (last_state is None or last_state['first_frame_s'] is None):
+            warm = "pre-warmed" if ctx.video_processor.engine_warm else "cold"
+            first_frame_placeholder.caption(f"First frame after {state['first_frame_s']:.2f} s ({warm} engine)")
+        last_state = state
+        time.sleep(0.25)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
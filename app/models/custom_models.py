@@ -1,5 +1,6 @@
 import mediapipe as mp
-import numpy as np
+
+from utils.angles import calculate_angle
 
 class BicepModel:
     def __init__(self):
@@ -8,14 +9,7 @@ class BicepModel:
         self.stage = None
         
     def calculate_angle(self, a, b, c):
-        a = np.array(a)
-        b = np.array(b)
-        c = np.array(c)
-        radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
-        angle = np.abs(radians*180.0/np.pi)
-        if angle > 180.0:
-            angle = 360-angle
-        return angle
+        return calculate_angle(a, b, c)
     
     def process_frame(self, frame, side="right"):
         # Implementation details here
@@ -28,14 +22,7 @@ class SquatDetector:
         self.stage = None
         
     def calculate_angle(self, a, b, c):
-        a = np.array(a)
-        b = np.array(b)
-        c = np.array(c)
-        radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
-        angle = np.abs(radians*180.0/np.pi)
-        if angle > 180.0:
-            angle = 360-angle
-        return angle
+        return calculate_angle(a, b, c)
     
     def process_frame(self, frame):
         # Implementation details here
@@ -1,18 +1,26 @@
 import streamlit as st
-import cv2
-import mediapipe as mp
-import numpy as np
 import time
 from datetime import datetime
 from pathlib import Path
 import sys
 
-# Add the parent directory to the path to import custom models
-parent_dir = str(Path(__file__).parent.parent)
-if parent_dir not in sys.path:
-    sys.path.append(parent_dir)
+# Add the project root to the path to import custom models
+# (app/ has its own stub models package, so the root must come first)
+root_dir = str(Path(__file__).resolve().parent.parent.parent)
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
 
-from models.custom_models import BicepModel, SquatDetector
+# MediaPipe is only imported by the engine pool's thread and group mode,
+# so this page renders without waiting for it
+from utils.capture_worker import CaptureWorker
+from utils.engine_pool import engine_pool
+from utils.frame_encoder import JpegFrameEncoder
+from utils.history_store import WorkoutHistoryStore
+from utils.landmark_filter import LandmarkFilter
+from utils.stage_timer import StageTimer
+from utils.streams import open_camera
+from config.settings import (EXERCISE_CONFIG, HISTORY_CONFIG, INFERENCE_CONFIG, LANDMARK_FILTER_CONFIG,
+                             MULTI_PERSON_CONFIG, RECORDING_CONFIG, TIMING_CONFIG, UI_CONFIG)
 
 st.set_page_config(
     page_title="Workout - AI Fitness Trainer",
@@ -23,18 +31,25 @@ st.set_page_config(
 # Initialize session state
 if 'processing_active' not in st.session_state:
     st.session_state.processing_active = False
-if 'bicep_model' not in st.session_state:
-    st.session_state.bicep_model = BicepModel()
-if 'squat_detector' not in st.session_state:
-    st.session_state.squat_detector = SquatDetector()
-if 'pose' not in st.session_state:
-    st.session_state.pose = mp.solutions.pose.Pose(
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5)
+if 'pose_engine' not in st.session_state:
+    # One pose graph per session, shared by every exercise counter; leased
+    # from the server-wide pool on Start Camera and returned on Stop
+    st.session_state.pose_engine = None
+if 'engine_lease' not in st.session_state:
+    st.session_state.engine_lease = None
+if 'engine_settings' not in st.session_state:
+    # Applied to the engine when it is leased, and live while it runs
+    st.session_state.engine_settings = {
+        'exercise_joints_only': False,
+        'keyframe_interval': INFERENCE_CONFIG['keyframe_interval'],
+        'smooth_landmarks': LANDMARK_FILTER_CONFIG['enabled'],
+    }
 if 'current_exercise' not in st.session_state:
     st.session_state.current_exercise = 'Bicep Curls'
 if 'camera' not in st.session_state:
     st.session_state.camera = None
+if 'capture_worker' not in st.session_state:
+    st.session_state.capture_worker = None
 if 'calories_burned' not in st.session_state:
     st.session_state.calories_burned = 0.0
 if 'start_time' not in st.session_state:
@@ -45,9 +60,72 @@ if 'last_rep_count' not in st.session_state:
     st.session_state.last_rep_count = 0
 if 'selected_hand' not in st.session_state:
     st.session_state.selected_hand = 'Right'
+if 'record_landmarks' not in st.session_state:
+    st.session_state.record_landmarks = False
+if 'group_engine' not in st.session_state:
+    # Built on first use: one pose graph per tracked person
+    st.session_state.group_engine = None
+if 'group_mode' not in st.session_state:
+    st.session_state.group_mode = False
+if 'first_frame' not in st.session_state:
+    # (seconds from Start Camera to the first processed frame shown, engine was pre-warmed)
+    st.session_state.first_frame = None
+
+if 'stage_timer' not in st.session_state:
+    # Per-stage latencies of the running camera session
+    st.session_state.stage_timer = None
+
+# Build and warm pose engines in the background while the page is in use
+engine_pool()
+
+# The pool expired this session's lease (no heartbeat for lease_timeout): its
+# cleanups closed the worker, camera and group graphs, and the engine may
+# already be leased to another session, so drop every reference to them
+if st.session_state.engine_lease is not None and st.session_state.engine_lease.released:
+    st.session_state.engine_lease = None
+    st.session_state.pose_engine = None
+    st.session_state.capture_worker = None
+    st.session_state.camera = None
+    if st.session_state.group_mode:
+        st.session_state.group_engine = None
+    st.session_state.processing_active = False
+
+@st.cache_resource
+def get_history_store():
+    # One SQLite connection shared by every session of this server process
+    return WorkoutHistoryStore()
 
 def initialize_camera():
-    return cv2.VideoCapture(0)
+    # VIDEO_CONFIG['source'] picks the camera (or stream) this page reads
+    return open_camera()
+
+def recording_path():
+    directory = Path(RECORDING_CONFIG['directory'])
+    if not directory.is_absolute():
+        directory = Path(root_dir) / directory
+    return directory / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.plm"
+
+def release_camera():
+    lease = st.session_state.engine_lease
+    worker = st.session_state.capture_worker
+    if worker is not None and not st.session_state.group_mode and (lease is None or not lease.released):
+        # Close the .plm recording now, between frames, rather than when the
+        # pool resets the engine on its own thread
+        worker.stop_recording()
+    if lease is not None:
+        # Its cleanup closes the worker: camera (and group graphs) are released
+        # once the thread is out of its frame. An expired lease already did this
+        lease.release()
+        if st.session_state.group_mode:
+            st.session_state.group_engine = None
+    elif worker is not None:
+        worker.close()
+    elif st.session_state.camera is not None:
+        st.session_state.camera.release()
+    st.session_state.engine_lease = None
+    st.session_state.pose_engine = None
+    st.session_state.capture_worker = None
+    st.session_state.camera = None
 
 def format_time(seconds):
     minutes = int(seconds // 60)
@@ -55,26 +133,121 @@ def format_time(seconds):
     return f"{minutes:02d}:{seconds:02d}"
 
 def calculate_calories_from_reps(reps, weight_kg, exercise_type):
-    if exercise_type == 'Bicep Curls':
-        calories_per_rep = 0.2 * (weight_kg / 70)
-    else:  # Squats
-        calories_per_rep = 0.32 * (weight_kg / 70)
+    calories_per_rep = EXERCISE_CONFIG[exercise_type]['calories_per_rep'] * (weight_kg / 70)
     return reps * calories_per_rep
 
+class MetricsPanel:
+    """Metric widgets that are built once and only re-sent when their value changes.
+
+    Each metric gets its own placeholder, and refreshes are capped at
+    max_rate per second, so an unchanged row costs no websocket traffic.
+    """
+
+    def __init__(self, container, labels, max_rate=UI_CONFIG['metrics_rate']):
+        with container:
+            columns = st.columns(len(labels))
+        self.labels = labels
+        self.placeholders = [column.empty() for column in columns]
+        self.values = [None] * len(labels)
+        self.interval = 1.0 / max_rate if max_rate else 0.0
+        self.last_update = 0.0
+
+    def update(self, *values):
+        now = time.monotonic()
+        if now - self.last_update < self.interval:
+            return
+        self.last_update = now
+
+        for i, value in enumerate(values):
+            if value != self.values[i]:
+                self.placeholders[i].metric(self.labels[i], value)
+                self.values[i] = value
+
+def apply_engine_settings(engine):
+    settings = st.session_state.engine_settings
+    engine.exercise_joints_only = settings['exercise_joints_only']
+    engine.keyframe_interval = settings['keyframe_interval']
+    if settings['smooth_landmarks'] != (engine.filter is not None):
+        engine.filter = LandmarkFilter() if settings['smooth_landmarks'] else None
+
+def lease_pose_engine(group_mode=False):
+    """This session's lease from the shared pool; None if every engine is busy.
+
+    Group mode builds its own per-person graphs, so its lease holds no engine
+    and only heartbeats, to get the same cleanup on disconnect.
+    """
+    pool = engine_pool()
+    lease = pool.session() if group_mode else pool.lease()
+    if lease is not None:
+        st.session_state.engine_lease = lease
+        st.session_state.pose_engine = lease.engine
+        if lease.engine is not None:
+            apply_engine_settings(lease.engine)
+    return lease
+
+def close_with_lease(lease, worker, close_engine=False):
+    # Runs on the pool's thread if this tab stops heartbeating, so it must only
+    # touch the worker, never st.session_state (the pool stops a pooled engine's
+    # recording when it resets it)
+    lease.on_release(lambda: worker.close(close_engine=close_engine))
+    # close() stops waiting after a second; a pooled engine stays out of the
+    # pool until the worker is really done with it
+    lease.hold_while(worker.is_alive)
+
+def get_group_engine(max_people):
+    if st.session_state.group_engine is None:
+        from models.multi_person import MultiPersonEngine
+        st.session_state.group_engine = MultiPersonEngine(max_people=max_people)
+    st.session_state.group_engine.max_people = max_people
+    st.session_state.group_engine.exercise_joints_only = st.session_state.engine_settings['exercise_joints_only']
+    return st.session_state.group_engine
+
+def format_people(people, exercise_type):
+    return "  ·  ".join(f"**#{person_id}**: {state[exercise_type]['counter']} reps"
+                        for person_id, state in sorted(people.items())) or "No one detected yet"
+
+STAGE_LABELS = {
+    'capture': 'Camera read',
+    'color': 'Color conversion / resize',
+    'inference': 'Pose inference',
+    'drawing': 'Drawing & counting',
+    'display': 'Encode & display',
+}
+
+def format_timings(report, first_frame=None, pool=None):
+    capture_fps = report['capture']['fps']
+    display_fps = report['display']['fps']
+    header = f"**Camera:** {capture_fps:.1f} FPS  ·  **Display:** {display_fps:.1f} FPS"
+    if first_frame is not None:
+        seconds, warm = first_frame
+        header += f"  ·  **First frame:** {seconds:.2f} s ({'pre-warmed' if warm else 'cold'} engine)"
+    if pool is not None:
+        header += f"  ·  **Engines:** {pool['leased']} leased, {pool['idle']} idle of {pool['max_engines']}"
+    lines = [header, "",
+             "| Stage | Per sec | p50 (ms) | p95 (ms) |", "|---|---:|---:|---:|"]
+    for stage, stats in report.items():
+        if stats['samples'] == 0:
+            continue
+        lines.append(f"| {STAGE_LABELS.get(stage, stage)} | {stats['fps']:.1f} | "
+                     f"{stats['p50_ms']:.1f} | {stats['p95_ms']:.1f} |")
+    return "\n".join(lines)
+
 def save_workout_summary():
-    if st.session_state.start_time is not None:
+    # Group sessions aren't attributed to the local user's history
+    if (st.session_state.start_time is not None and not st.session_state.group_mode
+            and st.session_state.pose_engine is not None):
         workout_data = {
             'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'exercise_type': st.session_state.current_exercise,
             'reps': st.session_state.last_rep_count,
             'calories': st.session_state.calories_burned,
-            'duration_mins': st.session_state.exercise_duration / 60
+            'duration_mins': st.session_state.exercise_duration / 60,
+            # Compact tempo / range-of-motion summary of the session's angle trace
+            'details': st.session_state.pose_engine.counters[st.session_state.current_exercise].trace.summary()
         }
         
-        if 'workout_history' not in st.session_state:
-            st.session_state.workout_history = []
-        
-        st.session_state.workout_history.append(workout_data)
+        user_id = st.session_state.get('user_id', HISTORY_CONFIG['default_user'])
+        get_history_store().append(user_id, workout_data)
 
 def main():
     st.markdown("""
@@ -93,16 +266,20 @@ def main():
     
     stframe = st.empty()
     metrics_container = st.empty()
+    people_placeholder = st.empty()
 
     # Exercise settings in expandable section
     with st.expander("Workout Settings", expanded=True):
+        exercises = list(EXERCISE_CONFIG)
         exercise_type = st.radio(
             "Choose Exercise:",
-            options=['Bicep Curls', 'Squats'],
-            index=0 if st.session_state.current_exercise == 'Bicep Curls' else 1,
+            options=exercises,
+            index=exercises.index(st.session_state.current_exercise),
         )
+        st.session_state.current_exercise = exercise_type
 
-        if exercise_type == 'Bicep Curls':
+        # Exercises counted per side let the user pick which side(s) to count
+        if EXERCISE_CONFIG[exercise_type]['aggregate'] == 'selected':
             selected_hand = st.radio(
                 "Select Hand:",
                 options=['Left', 'Right', 'Both'],
@@ -117,6 +294,51 @@ def main():
             show_angles = st.checkbox("Show Angles", value=True)
         with col2:
             show_counter = st.checkbox("Show Counter", value=True)
+        settings = st.session_state.engine_settings
+        settings['exercise_joints_only'] = st.checkbox(
+            "Exercise Joints Only",
+            value=settings['exercise_joints_only']
+        )
+
+        # Frames between keyframes reuse extrapolated landmarks instead of running the model
+        settings['keyframe_interval'] = st.slider(
+            "Pose Inference Every N Frames", min_value=1, max_value=6,
+            value=settings['keyframe_interval']
+        )
+
+        # One Euro filter on the landmarks: steadier angles, so jitter doesn't double count
+        settings['smooth_landmarks'] = st.checkbox(
+            "Smooth Landmarks",
+            value=settings['smooth_landmarks']
+        )
+        worker = st.session_state.capture_worker
+        if worker is not None and worker.engine is st.session_state.pose_engine:
+            # The worker reads these every frame; swap them between frames
+            worker.apply(apply_engine_settings)
+        elif st.session_state.pose_engine is not None:
+            apply_engine_settings(st.session_state.pose_engine)
+
+        # Track several people in front of the camera, each with their own counter
+        group_mode = st.checkbox(
+            "Group Mode",
+            value=st.session_state.group_mode,
+            disabled=st.session_state.capture_worker is not None
+        )
+        max_people = st.slider(
+            "Max People", min_value=2, max_value=8,
+            value=MULTI_PERSON_CONFIG['max_people'],
+            disabled=not group_mode
+        )
+
+        # Save the landmark stream so the session can be re-scored without the video
+        st.session_state.record_landmarks = st.checkbox(
+            "Record Landmarks",
+            value=st.session_state.record_landmarks
+        )
+
+    # Where the time per frame goes: camera, MediaPipe or the browser round trip
+    with st.expander("Performance", expanded=False):
+        timings_placeholder = st.empty()
 
     # Camera controls
     col1, col2 = st.columns(2)
@@ -125,58 +347,97 @@ def main():
         if st.button("Start Camera", use_container_width=True):
             st.session_state.processing_active = True
             if st.session_state.camera is None:
-                st.session_state.camera = initialize_camera()
-                st.session_state.start_time = time.time()
-                st.session_state.calories_burned = 0.0
-                st.session_state.last_rep_count = 0
+                st.session_state.start_requested = time.perf_counter()
+                st.session_state.first_frame = None
+                # Waits for an engine that is still being built or re-warmed
+                with st.spinner("Preparing pose engine..."):
+                    lease = lease_pose_engine(group_mode)
+                if lease is None:
+                    st.error("All pose engines are in use. Please try again in a moment.")
+                    st.session_state.processing_active = False
+                else:
+                    st.session_state.camera = initialize_camera()
+                    st.session_state.group_mode = group_mode
+                    if group_mode:
+                        engine = get_group_engine(max_people)
+                        engine.reset()
+                        warm = False
+                    else:
+                        engine, warm = lease.engine, lease.warm
+                    st.session_state.engine_warm = warm
+                    st.session_state.stage_timer = StageTimer()
+                    engine.timer = st.session_state.stage_timer
+                    st.session_state.capture_worker = CaptureWorker(st.session_state.camera, engine,
+                                                                    timer=st.session_state.stage_timer)
+                    # Group graphs belong to this session alone; close them with it
+                    close_with_lease(lease, st.session_state.capture_worker, close_engine=group_mode)
+                    if st.session_state.record_landmarks and not group_mode:
+                        try:
+                            st.session_state.capture_worker.start_recording(recording_path())
+                        except Exception as e:
+                            print(f"Error starting landmark recording: {e}")
+                    st.session_state.start_time = time.time()
+                    st.session_state.calories_burned = 0.0
+                    st.session_state.last_rep_count = 0
 
     with col2:
         if st.button("Stop Camera", use_container_width=True):
             if st.session_state.processing_active:
                 save_workout_summary()
             st.session_state.processing_active = False
-            if st.session_state.camera is not None:
-                st.session_state.camera.release()
-                st.session_state.camera = None
+            release_camera()
 
     # Reset button full width
     if st.button("Reset Counter", use_container_width=True):
-        if exercise_type == 'Bicep Curls':
-            st.session_state.bicep_model.reset_counter()
-        else:
-            st.session_state.squat_detector.reset_counter()
+        if st.session_state.capture_worker is not None:
+            st.session_state.capture_worker.reset_counter(exercise_type)
+        elif st.session_state.pose_engine is not None:
+            st.session_state.pose_engine.counters[exercise_type].reset_counter()
         st.session_state.calories_burned = 0.0
         st.session_state.last_rep_count = 0
         if st.session_state.processing_active:
             st.session_state.start_time = time.time()
 
+    worker = st.session_state.capture_worker
+    if worker is not None:
+        # Capture and inference run on the worker; this loop only shows the newest result
+        worker.set_options(
+            active=[exercise_type],
+            show_counter=show_counter,
+            options={name: {'show_angles': show_angles,
+                            'weight_kg': weight_kg,
+                            'selected_hand': st.session_state.selected_hand}
+                     for name in EXERCISE_CONFIG}
+        )
+        worker.start()
+        metrics = MetricsPanel(metrics_container, ["Reps", "Calories Burned", "Exercise Duration"])
+        encoder = JpegFrameEncoder()
+        timer = st.session_state.stage_timer
+
     try:
-        while st.session_state.processing_active and st.session_state.camera is not None:
-            ret, frame = st.session_state.camera.read()
-            if not ret:
-                st.error("Failed to read from camera!")
+        last_seq = 0
+        last_people = None
+        last_timings = 0.0
+        lease = st.session_state.engine_lease
+        while st.session_state.processing_active and worker is not None:
+            # Heartbeat: without it the pool reclaims the engine and camera
+            if lease is not None and not lease.touch():
+                st.warning("Camera session expired. Press Start Camera to continue.")
+                st.session_state.processing_active = False
                 break
 
-            # Flip frame horizontally
-            frame = cv2.flip(frame, 1)
-
-            # Process frame based on selected exercise
-            if exercise_type == 'Bicep Curls':
-                processed_frame = st.session_state.bicep_model.process_frame(
-                    frame,
-                    show_angles=show_angles,
-                    show_counter=show_counter,
-                    weight_kg=weight_kg,
-                    selected_hand=selected_hand
-                )
-                current_reps = st.session_state.bicep_model.counter
-            else:  # Squats
-                processed_frame = st.session_state.squat_detector.process_frame(
-                    frame,
-                    show_angles=show_angles,
-                    show_counter=show_counter
-                )
-                current_reps = st.session_state.squat_detector.counter
+            if worker.error is not None:
+                st.error(worker.error)
+                break
+
+            result = worker.latest(last_seq)
+            if result is None:
+                # Nothing new yet; wait briefly instead of redrawing the same frame
+                time.sleep(0.005)
+                continue
+
+            last_seq, processed_frame, counter_state = result
+            current_reps = counter_state[exercise_type]['counter']
 
             # Update calories if rep count increased
             if current_reps > st.session_state.last_rep_count:
@@ -192,35 +453,51 @@ def main():
             if st.session_state.start_time is not None:
                 st.session_state.exercise_duration = time.time() - st.session_state.start_time
 
-            # Display metrics
-            with metrics_container:
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Reps", current_reps)
-                with col2:
-                    st.metric("Calories Burned", f"{st.session_state.calories_burned:.1f} kcal")
-                with col3:
-                    st.metric("Exercise Duration", format_time(st.session_state.exercise_duration))
+            # Per-person reps in group mode, re-sent only when they change
+            if 'people' in counter_state:
+                people = format_people(counter_state['people'], exercise_type)
+                if people != last_people:
+                    people_placeholder.markdown(people)
+                    last_people = people
+
+            # Display metrics (throttled, changed values only)
+            metrics.update(
+                current_reps,
+                f"{st.session_state.calories_burned:.1f} kcal",
+                format_time(st.session_state.exercise_duration)
+            )
 
             if processed_frame is not None:
-                # Update display
-                stframe.image(processed_frame, channels="BGR", use_container_width=True)
+                # Send pre-encoded JPEG so Streamlit doesn't convert and re-encode;
+                # None means the frame came in faster than display_fps
+                start = time.perf_counter()
+                jpeg = encoder.encode(processed_frame)
+                if jpeg is not None:
+                    stframe.image(jpeg, output_format="JPEG", use_container_width=True)
+                    shown = timer.since('display', start)
+                    if st.session_state.first_frame is None:
+                        # Cold-start cost as the user sees it: click to first processed frame
+                        st.session_state.first_frame = (shown - st.session_state.start_requested,
+                                                        st.session_state.engine_warm)
 
-            # Small delay to prevent high CPU usage
-            time.sleep(0.01)
+            now = time.perf_counter()
+            if now - last_timings >= TIMING_CONFIG['refresh']:
+                timings_placeholder.markdown(format_timings(timer.report(), st.session_state.first_frame,
+                                                          engine_pool().report()))
+                last_timings = now
 
     except Exception as e:
         st.error(f"Error: {e}")
 
     finally:
         if not st.session_state.processing_active and st.session_state.camera is not None:
-            st.session_state.camera.release()
-            st.session_state.camera = None
+            release_camera()
             st.session_state.start_time = None
             st.session_state.exercise_duration = 0
             st.session_state.last_rep_count = 0
             stframe.empty()
             metrics_container.empty()
+            people_placeholder.empty()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,18 +1,67 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
 import plotly.express as px
 import plotly.graph_objects as go
 
+# Add the project root to the path to import the history store
+root_dir = str(Path(__file__).resolve().parent.parent.parent)
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+from utils.history_store import WorkoutHistoryStore, week_start
+from config.settings import HISTORY_CONFIG
+
 st.set_page_config(
     page_title="History - AI Fitness Trainer",
     page_icon="🏋️‍♂️",
     layout="wide"
 )
 
-# Initialize workout history in session state if it doesn't exist
-if 'workout_history' not in st.session_state:
-    st.session_state.workout_history = []
+@st.cache_resource
+def get_history_store():
+    # One SQLite connection shared by every session of this server process
+    return WorkoutHistoryStore()
+
+CHART_LAYOUT = dict(
+    height=300,
+    margin=dict(l=10, r=10, t=40, b=10),
+    plot_bgcolor='rgba(22, 27, 34, 0.8)',
+    paper_bgcolor='rgba(22, 27, 34, 0.8)',
+    font_color='white',
+    font_size=10
+)
+ROLLUP_COLUMNS = ['workouts', 'reps', 'calories', 'duration_mins']
+
+@st.cache_resource(max_entries=64)
+def build_figures(_store, user_id, version, start_day):
+    """Chart figures built from the rollup tables.
+
+    Keyed on the history version (bumped on every save or clear) and on the
+    first charted day, so reruns reuse the same figures until something changes.
+    """
+    daily = pd.DataFrame(_store.daily(user_id, start_day), columns=['day'] + ROLLUP_COLUMNS)
+    fig_calories = px.line(daily, x='day', y='calories',
+                         title=f"Calories Burned (last {HISTORY_CONFIG['chart_days']} days)",
+                         labels={'calories': 'kcal', 'day': 'Date'},
+                         markers=True)
+    fig_calories.update_layout(**CHART_LAYOUT)
+
+    weekly = pd.DataFrame(_store.weekly(user_id, week_start(start_day)), columns=['week'] + ROLLUP_COLUMNS)
+    fig_weekly = px.bar(weekly, x='week', y='reps',
+                        title='Reps per Week',
+                        labels={'reps': 'Reps', 'week': 'Week of'})
+    fig_weekly.update_layout(**CHART_LAYOUT)
+
+    exercise_dist = _store.exercise_counts(user_id)
+    fig_pie = go.Figure(data=[go.Pie(labels=list(exercise_dist.keys()), 
+                                   values=list(exercise_dist.values()),
+                                   hole=.3)])
+    fig_pie.update_layout(title='Exercise Types', **CHART_LAYOUT)
+
+    return fig_calories, fig_weekly, fig_pie
 
 def format_duration(minutes):
     hours = minutes // 60
@@ -28,8 +77,14 @@ def main():
         </div>
     """, unsafe_allow_html=True)
 
-    if st.session_state.workout_history:
-        df = pd.DataFrame(st.session_state.workout_history)
+    store = get_history_store()
+    user_id = st.session_state.get('user_id', HISTORY_CONFIG['default_user'])
+    totals = store.totals(user_id)
+
+    if totals['workouts']:
+        # Totals and charts come from rollups, so this costs the same for any history size
+        start_day = (datetime.now() - timedelta(days=HISTORY_CONFIG['chart_days'])).strftime('%Y-%m-%d')
+        fig_calories, fig_weekly, fig_pie = build_figures(store, user_id, store.version(user_id), start_day)
         
         # Summary Statistics in 2x2 grid
         col1, col2 = st.columns(2)
@@ -39,9 +94,9 @@ def main():
                     <h3>Total Workouts</h3>
                     <h2>{}</h2>
                 </div>
-            """.format(len(df)), unsafe_allow_html=True)
+            """.format(totals['workouts']), unsafe_allow_html=True)
             
-            total_calories = df['calories'].sum()
+            total_calories = totals['calories']
             st.markdown("""
                 <div class="stats-card">
                     <h3>Total Calories</h3>
@@ -50,7 +105,7 @@ def main():
             """.format(total_calories), unsafe_allow_html=True)
             
         with col2:
-            total_reps = df['reps'].sum()
+            total_reps = totals['reps']
             st.markdown("""
                 <div class="stats-card">
                     <h3>Total Reps</h3>
@@ -58,7 +113,7 @@ def main():
                 </div>
             """.format(total_reps), unsafe_allow_html=True)
             
-            total_duration = df['duration_mins'].sum()
+            total_duration = totals['duration_mins']
             st.markdown("""
                 <div class="stats-card">
                     <h3>Duration</h3>
@@ -67,36 +122,15 @@ def main():
             """.format(format_duration(total_duration)), unsafe_allow_html=True)
 
         # Graphs in tabs
-        tab1, tab2 = st.tabs(["Calories", "Exercises"])
+        tab1, tab2, tab3 = st.tabs(["Calories", "Weekly", "Exercises"])
         
         with tab1:
-            fig_calories = px.line(df, x='time', y='calories',
-                                 title='Calories Burned',
-                                 labels={'calories': 'kcal', 'time': 'Date'})
-            fig_calories.update_layout(
-                height=300,
-                margin=dict(l=10, r=10, t=40, b=10),
-                plot_bgcolor='rgba(22, 27, 34, 0.8)',
-                paper_bgcolor='rgba(22, 27, 34, 0.8)',
-                font_color='white',
-                font_size=10
-            )
             st.plotly_chart(fig_calories, use_container_width=True)
 
         with tab2:
-            exercise_dist = df['exercise_type'].value_counts()
-            fig_pie = go.Figure(data=[go.Pie(labels=exercise_dist.index, 
-                                           values=exercise_dist.values,
-                                           hole=.3)])
-            fig_pie.update_layout(
-                height=300,
-                margin=dict(l=10, r=10, t=40, b=10),
-                title='Exercise Types',
-                plot_bgcolor='rgba(22, 27, 34, 0.8)',
-                paper_bgcolor='rgba(22, 27, 34, 0.8)',
-                font_color='white',
-                font_size=10
-            )
+            st.plotly_chart(fig_weekly, use_container_width=True)
+
+        with tab3:
             st.plotly_chart(fig_pie, use_container_width=True)
 
         # Recent Workouts
@@ -106,8 +140,8 @@ def main():
             </div>
         """, unsafe_allow_html=True)
         
-        # Show only last 5 workouts by default
-        display_df = df.copy().tail(5)
+        # Show only the latest few workouts by default
+        display_df = pd.DataFrame(store.recent(user_id, HISTORY_CONFIG['recent_limit']))
         display_df['time'] = pd.to_datetime(display_df['time']).dt.strftime('%m/%d %H:%M')
         display_df['duration'] = display_df['duration_mins'].apply(format_duration)
         display_df['calories'] = display_df['calories'].round(0).astype(int).astype(str) + ' kcal'
@@ -123,7 +157,7 @@ def main():
         )
 
         if st.button("Clear History", type="secondary", use_container_width=True):
-            st.session_state.workout_history = []
+            store.clear(user_id)
             st.experimental_rerun()
 
     else:
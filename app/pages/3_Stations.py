@@ -0,0 +1,95 @@
+import streamlit as st
+import pandas as pd
+import time
+from pathlib import Path
+import sys
+
+# Add the project root to the path to import the stream runner
+root_dir = str(Path(__file__).resolve().parent.parent.parent)
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+from utils.streams import MultiStreamRunner
+from config.settings import EXERCISE_CONFIG, STREAMS_CONFIG
+
+st.set_page_config(
+    page_title="Stations - AI Fitness Trainer",
+    page_icon="🏋️‍♂️",
+    layout="wide"
+)
+
+if 'stream_runner' not in st.session_state:
+    st.session_state.stream_runner = None
+
+STATION_COLUMNS = ['station', 'source', 'core', 'fps', 'latency_ms_p50', 'latency_ms_p95',
+                   'reps', 'stage', 'status']
+
+def station_rows(reports, exercise):
+    rows = []
+    for r in reports:
+        counter = r.get('counters', {}).get(exercise, {})
+        rows.append({
+            'station': r['station'],
+            'source': r['source'],
+            'core': r.get('core'),
+            'fps': r['fps'],
+            'latency_ms_p50': r.get('latency_ms_p50'),
+            'latency_ms_p95': r.get('latency_ms_p95'),
+            'reps': counter.get('counter'),
+            'stage': counter.get('stage'),
+            'status': r['error'] or ('running' if r['running'] else 'stopped'),
+        })
+    return pd.DataFrame(rows, columns=STATION_COLUMNS)
+
+def stop_runner():
+    if st.session_state.stream_runner is not None:
+        st.session_state.stream_runner.stop()
+
+def main():
+    st.markdown("""
+        <div style='text-align: center; padding: 0.5rem;'>
+            <h1 style='color: #FF4B2B; font-size: 1.75rem;'>Stations</h1>
+        </div>
+    """, unsafe_allow_html=True)
+
+    runner = st.session_state.stream_runner
+    running = runner is not None and runner.is_running()
+
+    with st.expander("Station Settings", expanded=not running):
+        sources = st.text_input(
+            "Sources (camera indices, files or URLs, comma separated)",
+            value=", ".join(str(s) for s in STREAMS_CONFIG['sources']),
+            disabled=running
+        )
+        exercise_type = st.radio("Choose Exercise:", options=list(EXERCISE_CONFIG), disabled=running)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Start Stations", use_container_width=True, disabled=running):
+            stop_runner()
+            # One process per stream, each with its own pose graph and counters
+            runner = MultiStreamRunner([s.strip() for s in sources.split(',') if s.strip()],
+                                       exercises=[exercise_type])
+            runner.start()
+            st.session_state.stream_runner = runner
+            st.session_state.station_exercise = exercise_type
+    with col2:
+        if st.button("Stop Stations", use_container_width=True):
+            stop_runner()
+
+    table = st.empty()
+    runner = st.session_state.stream_runner
+    if runner is None:
+        st.info("Start the stations to see per-stream FPS, latency and reps.")
+        return
+
+    exercise = st.session_state.get('station_exercise', exercise_type)
+    table.dataframe(station_rows(runner.poll(), exercise), use_container_width=True, hide_index=True)
+    # Refresh while any station is still running
+    while runner.is_running():
+        time.sleep(STREAMS_CONFIG['report_interval'])
+        table.dataframe(station_rows(runner.poll(), exercise), use_container_width=True, hide_index=True)
+    table.dataframe(station_rows(runner.poll(), exercise), use_container_width=True, hide_index=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import cv2
-import numpy as np
 
 class VideoProcessor:
     def __init__(self, pose_model, squat_detector, bicep_model):
@@ -8,8 +7,8 @@ class VideoProcessor:
         self.bicep_model = bicep_model
         
     def process_frame(self, frame):
-        # Detect pose
-        frame, landmarks = self.pose_model.detect_pose(frame)
+        # Detect pose; the overlays below go onto the same frame
+        frame, landmarks = self.pose_model.detect_pose(frame, in_place=True)
         
         # Detect squat
         is_squat, squat_count = self.squat_detector.detect_squat(landmarks)
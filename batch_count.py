@@ -0,0 +1,170 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import cv2
+
+from config.settings import EXERCISE_CONFIG, POSE_CONFIG
+from models.pose_engine import PoseEngine
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v'}
+EXERCISES = list(EXERCISE_CONFIG)
+
+# One pose engine per worker process, built by _init_worker
+_engine = None
+
+def _init_worker(model_complexity, keyframe_interval, roi_tracking, inference_width, smoothing):
+    global _engine
+    # Parallelism comes from the process pool; keep OpenCV single-threaded per worker
+    cv2.setNumThreads(1)
+    _engine = PoseEngine(keyframe_interval=keyframe_interval, roi_tracking=roi_tracking,
+                         inference_width=inference_width, smoothing=smoothing,
+                         model_complexity=model_complexity)
+    for name in EXERCISES:
+        _engine.add_exercise(name)
+
+def count_video(path, exercises, selected_hand=None, flip=True):
+    """Run the rep counters over one recording and return a report row"""
+    for counter in _engine.counters.values():
+        counter.reset_counter()
+
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        return {'file': str(path), 'error': 'could not open video'}
+
+    # Each file is a new, unrelated stream; drop tracking state from the last one
+    _engine.reset()
+
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 0
+    options = {name: {'selected_hand': selected_hand} for name in exercises}
+    frames = 0
+    detected = 0
+    decode_time = 0.0
+    inference_time = 0.0
+    start = time.perf_counter()
+
+    frame = None
+    try:
+        while True:
+            t0 = time.perf_counter()
+            # Decoded into the previous frame's buffer and flipped in place
+            ret, frame = cap.read(frame)
+            if not ret:
+                break
+            if flip:
+                # Match the mirrored view the live Workout page counts on
+                cv2.flip(frame, 1, dst=frame)
+            t1 = time.perf_counter()
+
+            if _engine.update(frame, active=exercises, options=options):
+                detected += 1
+            t2 = time.perf_counter()
+
+            frames += 1
+            decode_time += t1 - t0
+            inference_time += t2 - t1
+    finally:
+        cap.release()
+
+    elapsed = time.perf_counter() - start
+    row = {
+        'file': str(path),
+        'frames': frames,
+        'detected_frames': detected,
+        'video_seconds': round(frames / video_fps, 2) if video_fps else None,
+        'wall_seconds': round(elapsed, 3),
+        'decode_seconds': round(decode_time, 3),
+        'inference_seconds': round(inference_time, 3),
+        'fps': round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    for name in exercises:
+        row[f"{name.lower().replace(' ', '_')}_reps"] = _engine.counters[name].counter
+    return row
+
+def find_videos(directory):
+    return sorted(p for p in Path(directory).rglob('*')
+                  if p.is_file() and p.suffix.lower() in VIDEO_EXTENSIONS)
+
+def write_report(rows, output):
+    if output.endswith('.json'):
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+        return
+
+    fieldnames = []
+    for row in rows:
+        fieldnames.extend(k for k in row if k not in fieldnames)
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count reps in recorded workout videos without a display")
+    parser.add_argument('directory', help="Directory searched recursively for video files")
+    parser.add_argument('--exercise', choices=EXERCISES + ['all'], default='all')
+    parser.add_argument('--hand', choices=['Left', 'Right', 'Both'],
+                        help="Side(s) counted for per-side exercises (default: each exercise's default_side)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--model-complexity', type=int, choices=[0, 1, 2], default=POSE_CONFIG['model_complexity'])
+    parser.add_argument('--keyframe-interval', type=int, default=1,
+                        help="Run full inference every N frames and extrapolate in between")
+    parser.add_argument('--inference-width', type=int, default=-1,
+                        help="Downscale frames to this width for inference (0 = native, default from VIDEO_CONFIG)")
+    parser.add_argument('--roi', action='store_true',
+                        help="Run inference on a crop around the tracked person")
+    parser.add_argument('--smooth', action='store_true', default=None,
+                        help="One Euro filter the landmarks before counting (default from LANDMARK_FILTER_CONFIG)")
+    parser.add_argument('--no-flip', action='store_true',
+                        help="Don't mirror frames (the live page mirrors the webcam)")
+    parser.add_argument('--output', help="Write the report to a .csv or .json file")
+    args = parser.parse_args(argv)
+
+    videos = find_videos(args.directory)
+    if not videos:
+        print(f"No video files found in {args.directory}")
+        return 1
+
+    exercises = EXERCISES if args.exercise == 'all' else [args.exercise]
+    workers = max(1, min(args.workers, len(videos)))
+    print(f"Processing {len(videos)} video(s) with {workers} worker(s)")
+
+    rows = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(args.model_complexity, args.keyframe_interval,
+                                       args.roi, args.inference_width, args.smooth)) as pool:
+        futures = {pool.submit(count_video, path, exercises, args.hand, not args.no_flip): path
+                   for path in videos}
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except Exception as e:
+                row = {'file': str(futures[future]), 'error': str(e)}
+            rows.append(row)
+
+            if 'error' in row:
+                print(f"{row['file']}: ERROR {row['error']}")
+            else:
+                reps = ", ".join(f"{k}={v}" for k, v in row.items() if k.endswith('_reps'))
+                print(f"{row['file']}: {reps} | {row['frames']} frames in "
+                      f"{row['wall_seconds']}s ({row['fps']} fps)")
+
+    rows.sort(key=lambda r: r['file'])
+    total_frames = sum(r.get('frames', 0) for r in rows)
+    elapsed = time.perf_counter() - start
+    print(f"\nDone: {total_frames} frames in {elapsed:.1f}s "
+          f"({total_frames / elapsed if elapsed > 0 else 0:.1f} fps overall)")
+
+    if args.output:
+        write_report(rows, args.output)
+        print(f"Report written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+root_dir = str(Path(__file__).resolve().parent.parent)
+
+HEAVY_MODULES = ['numpy', 'cv2', 'mediapipe', 'pandas', 'plotly.express', 'streamlit']
+
+# Run in a fresh interpreter per measurement so nothing is imported or warm yet
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+try:
+    __import__(sys.argv[1])
+    print(json.dumps({'seconds': time.perf_counter() - start}))
+except Exception as e:
+    print(json.dumps({'error': str(e)}))
+"""
+
+ENGINE_PROBE = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+import numpy as np
+from config.settings import VIDEO_CONFIG
+
+frame = np.zeros((VIDEO_CONFIG['height'], VIDEO_CONFIG['width'], 3), dtype=np.uint8)
+result = {}
+start = time.perf_counter()
+if sys.argv[2] == 'cold':
+    # What Start Camera used to do: import, build and run the first frame on the spot
+    from utils.engine_pool import build_engine
+    engine = build_engine()
+    result['build_s'] = time.perf_counter() - start
+    t = time.perf_counter()
+    engine.process_frame(frame)
+    result['first_frame_s'] = time.perf_counter() - t
+else:
+    # The pool warms an engine in the background; the user clicks once it is ready
+    from utils.engine_pool import engine_pool
+    pool = engine_pool()
+    while pool.report()['idle'] == 0:
+        time.sleep(0.01)
+    result['background_s'] = time.perf_counter() - start
+    t = time.perf_counter()
+    engine = pool.lease().engine
+    result['build_s'] = time.perf_counter() - t
+    t = time.perf_counter()
+    engine.process_frame(frame)
+    result['first_frame_s'] = time.perf_counter() - t
+result['time_to_first_frame_s'] = result['build_s'] + result['first_frame_s']
+t = time.perf_counter()
+for _ in range(10):
+    engine.process_frame(frame)
+result['steady_frame_s'] = (time.perf_counter() - t) / 10
+print(json.dumps(result))
+"""
+
+def probe(code, *args):
+    out = subprocess.run([sys.executable, '-c', code, *args], capture_output=True, text=True, cwd=root_dir)
+    # MediaPipe logs to stderr; the result is the last line on stdout
+    lines = out.stdout.strip().splitlines()
+    if not lines:
+        return {'error': out.stderr.strip().splitlines()[-1] if out.stderr.strip() else 'no output'}
+    return json.loads(lines[-1])
+
+def median_of(runs):
+    ok = [r for r in runs if 'error' not in r]
+    if not ok:
+        return runs[-1]
+    return {key: round(statistics.median(r[key] for r in ok), 4) for key in ok[0]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure cold-start costs: heavy imports and time to the first processed frame, "
+                    "with and without a pre-warmed pose engine")
+    parser.add_argument('--runs', type=int, default=3, help="Fresh interpreters per measurement (median reported)")
+    parser.add_argument('--output', help="Write the results to a .json file")
+    args = parser.parse_args(argv)
+
+    results = {'imports': {}, 'engine': {}}
+    for module in HEAVY_MODULES:
+        results['imports'][module] = median_of([probe(IMPORT_PROBE, module) for _ in range(args.runs)])
+    for mode in ('cold', 'prewarmed'):
+        results['engine'][mode] = median_of([probe(ENGINE_PROBE, root_dir, mode) for _ in range(args.runs)])
+
+    print(f"{'import':<18} {'seconds':>8}")
+    for module, r in results['imports'].items():
+        print(f"{module:<18} {r['seconds'] if 'error' not in r else 'error: ' + r['error']:>8}")
+    print()
+    print(f"{'engine':<10} {'lease/build s':>13} {'first frame s':>14} {'to first frame s':>17} {'steady s':>9}")
+    for mode, r in results['engine'].items():
+        if 'error' in r:
+            print(f"{mode:<10} error: {r['error']}")
+            continue
+        print(f"{mode:<10} {r['build_s']:>13} {r['first_frame_s']:>14} {r['time_to_first_frame_s']:>17} "
+              f"{r['steady_frame_s']:>9}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+# Add the project root to the path when run as a script
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+from config.settings import EXERCISE_CONFIG, POSE_CONFIG, VIDEO_CONFIG
+from models.exercise_engine import ExerciseEngine
+from models.pose_engine import PoseEngine
+from utils.angles import calculate_angle, joint_angles, landmarks_to_array
+from utils.drawing import draw_skeleton
+from utils.frame_encoder import JpegFrameEncoder
+from utils.landmark_recording import LandmarkRecording
+from utils.overlay import OverlayRenderer
+
+# Normalized x, y of a person standing facing the camera, in PoseLandmark order
+STANDING_POSE = np.array([
+    (0.50, 0.20), (0.51, 0.185), (0.52, 0.185), (0.53, 0.186), (0.49, 0.185), (0.48, 0.185),
+    (0.47, 0.186), (0.545, 0.195), (0.455, 0.195), (0.515, 0.225), (0.485, 0.225),
+    (0.58, 0.30), (0.42, 0.30), (0.61, 0.42), (0.39, 0.42), (0.62, 0.53), (0.38, 0.53),
+    (0.625, 0.56), (0.375, 0.56), (0.62, 0.565), (0.38, 0.565), (0.615, 0.55), (0.385, 0.55),
+    (0.55, 0.56), (0.45, 0.56), (0.555, 0.72), (0.445, 0.72), (0.56, 0.88), (0.44, 0.88),
+    (0.555, 0.90), (0.445, 0.90), (0.575, 0.92), (0.425, 0.92),
+], dtype=np.float32)
+
+# Below this share of frames with a pose, the model stages mostly time
+# MediaPipe's person detector rather than the landmark model
+MIN_DETECTION_RATE = 0.5
+
+# Shoulder, elbow and the hand landmarks (wrist, pinky, index, thumb) moved by the synthetic curl
+_ARMS = ((11, 13, (15, 17, 19, 21)), (12, 14, (16, 18, 20, 22)))
+
+def synthetic_landmarks(count):
+    """(count, 33, 4) landmarks of a standing person doing bicep curls"""
+    landmarks = np.empty((count, 33, 4), dtype=np.float32)
+    landmarks[:, :, :2] = STANDING_POSE
+    landmarks[:, :, 2] = 0.0
+    landmarks[:, :, 3] = 0.99
+
+    # Elbow angle sweeps 170 -> 20 -> 170 degrees every 60 frames, past both
+    # Bicep Curls thresholds, so every cycle counts a rep
+    phase = np.arange(count) % 60 / 60.0
+    target = 170.0 - 150.0 * (1 - np.abs(2 * phase - 1))
+    for shoulder, elbow, hand in _ARMS:
+        start = calculate_angle(STANDING_POSE[shoulder], STANDING_POSE[elbow], STANDING_POSE[hand[0]])
+        flexion = np.radians(start - target)
+        offsets = landmarks[:, hand, :2] - landmarks[:, elbow, None, :2]
+        # Rotate the forearm up towards the shoulder, not out through 180
+        sign = -1.0 if elbow == 14 else 1.0
+        c, s = np.cos(sign * flexion)[:, None], np.sin(sign * flexion)[:, None]
+        x, y = offsets[..., 0].copy(), offsets[..., 1].copy()
+        offsets[..., 0] = c * x - s * y
+        offsets[..., 1] = s * x + c * y
+        landmarks[:, hand, :2] = landmarks[:, elbow, None, :2] + offsets
+    return landmarks
+
+def synthetic_frames(landmarks, width, height, seed=0):
+    """Render a filled stick figure for each landmark set onto a noisy background.
+
+    Cheap and deterministic, but MediaPipe finds no person in these frames, so
+    they only exercise the model stages' detector path.
+    """
+    rng = np.random.default_rng(seed)
+    background = np.empty((height, width, 3), dtype=np.uint8)
+    background[:] = np.linspace(60, 140, height, dtype=np.uint8)[:, None, None]
+    background = cv2.add(background, rng.integers(0, 20, background.shape, dtype=np.uint8))
+
+    limbs = [(11, 12), (11, 23), (12, 24), (23, 24), (11, 13), (13, 15), (12, 14), (14, 16),
+             (23, 25), (25, 27), (24, 26), (26, 28), (27, 31), (28, 32)]
+    frames = []
+    for points in landmarks:
+        frame = background.copy()
+        pts = np.rint(points[:, :2] * (width, height)).astype(np.int32)
+        torso = pts[[11, 12, 24, 23]]
+        cv2.fillConvexPoly(frame, torso, (70, 90, 160))
+        for a, b in limbs:
+            cv2.line(frame, tuple(pts[a]), tuple(pts[b]), (120, 150, 200), max(width // 40, 2))
+        cv2.circle(frame, tuple(pts[0]), max(width // 25, 3), (140, 170, 220), -1)
+        frames.append(frame)
+    return frames
+
+def video_frames(path, count, width):
+    """Up to count frames from a video file, resized to width"""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    try:
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if width and frame.shape[1] != width:
+                frame = cv2.resize(frame, (width, int(frame.shape[0] * width / frame.shape[1])))
+            frames.append(frame)
+    finally:
+        cap.release()
+    return frames
+
+def recorded_landmarks(path, count):
+    """Detected landmarks from a .plm recording, at most count frames"""
+    recording = LandmarkRecording(path)
+    landmarks = np.array(recording.landmarks[recording.detected()][:count])
+    return landmarks
+
+def to_landmark_list(landmarks):
+    """MediaPipe NormalizedLandmarkList for a (33, 4) array, as pose.process returns it"""
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility in landmarks.tolist():
+        landmark_list.landmark.add(x=x, y=y, z=z, visibility=visibility)
+    return landmark_list
+
+def time_stage(fn, count, iterations, warmup):
+    """Call fn(i) for i in range(iterations) after warmup calls; returns seconds per call"""
+    for i in range(warmup):
+        fn(i % count)
+    times = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i % count)
+        times[i] = time.perf_counter() - start
+    return times
+
+def summarize(times):
+    p50, p95, p99 = np.percentile(times, [50, 95, 99]) * 1000
+    mean = float(times.mean())
+    return {
+        'iterations': len(times),
+        'mean_ms': round(mean * 1000, 4),
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'fps': round(1.0 / mean, 1) if mean > 0 else None,
+    }
+
+def build_stages(frames, landmarks, complexities):
+    """(name, fn(i), model stage) for every stage; fn works on frame / landmarks i.
+
+    Model stages carry a model complexity instead of fn (None for the whole
+    PoseEngine pipeline) and are timed by run_pose_stage with their own graph.
+    """
+    rgb = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    landmark_lists = [to_landmark_list(points) for points in landmarks]
+    canvas = frames[0].copy()
+    buffer = np.empty((33, 4), dtype=np.float32)
+
+    engine = ExerciseEngine()
+    elbow = [getattr(mp.solutions.pose.PoseLandmark, name).value
+             for name in EXERCISE_CONFIG['Bicep Curls']['sides']['Right']]
+    mp_drawing = mp.solutions.drawing_utils
+    connections = mp.solutions.pose.POSE_CONNECTIONS
+    overlay = OverlayRenderer()
+    encoder = JpegFrameEncoder(max_fps=0)
+    params = [cv2.IMWRITE_JPEG_QUALITY, VIDEO_CONFIG['jpeg_quality']]
+
+    def legacy_overlay(i):
+        # Counter box as the original counters drew it, text rasterized every frame
+        cv2.rectangle(canvas, (0, 0), (225, 73), (245, 117, 16), -1)
+        cv2.putText(canvas, 'REPS', (15, 12), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1, cv2.LINE_AA)
+        cv2.putText(canvas, str(i // 30), (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 2, cv2.LINE_AA)
+        cv2.putText(canvas, 'STAGE', (65, 12), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1, cv2.LINE_AA)
+        cv2.putText(canvas, 'up', (60, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 2, cv2.LINE_AA)
+        cv2.putText(canvas, '90', (300, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2, cv2.LINE_AA)
+
+    def sprite_overlay(i):
+        overlay.draw_counter(canvas, i // 30, 'up')
+        overlay.draw_label(canvas, '90', (300, 200))
+
+    flipped = [frame.copy() for frame in frames]
+    rgb_buffer = np.empty_like(frames[0])
+
+    stages = [
+        ('flip', lambda i: cv2.flip(frames[i], 1), False),
+        ('flip_inplace', lambda i: cv2.flip(flipped[i], 1, dst=flipped[i]), False),
+        ('cvtcolor_bgr2rgb', lambda i: cv2.cvtColor(frames[i], cv2.COLOR_BGR2RGB), False),
+        ('cvtcolor_bgr2rgb_reused', lambda i: cv2.cvtColor(frames[i], cv2.COLOR_BGR2RGB, dst=rgb_buffer), False),
+        ('cvtcolor_rgb2bgr', lambda i: cv2.cvtColor(rgb[i], cv2.COLOR_RGB2BGR), False),
+    ]
+    for complexity in complexities:
+        stages.append((f'pose_process_c{complexity}', complexity, True))
+    stages += [
+        ('landmark_extraction', lambda i: landmarks_to_array(landmark_lists[i], out=buffer), False),
+        ('calculate_angle', lambda i: calculate_angle(*landmarks[i, elbow]), False),
+        ('joint_angles_all', lambda i: joint_angles(landmarks[i], engine.triplets), False),
+        ('draw_landmarks', lambda i: mp_drawing.draw_landmarks(canvas, landmark_lists[i], connections), False),
+        ('draw_skeleton', lambda i: draw_skeleton(canvas, landmarks[i]), False),
+        ('text_overlay_puttext', legacy_overlay, False),
+        ('text_overlay_sprites', sprite_overlay, False),
+        ('encode_jpeg_full', lambda i: cv2.imencode('.jpg', frames[i], params), False),
+        ('encode_jpeg_display', lambda i: encoder.encode(frames[i]), False),
+        ('pipeline_process_frame', None, True),
+    ]
+    return stages
+
+def run_pose_stage(complexity, frames, iterations, warmup):
+    """Time pose.process (or the whole PoseEngine.process_frame when complexity is None)"""
+    rgb = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    if complexity is None:
+        engine = PoseEngine()
+        for exercise in EXERCISE_CONFIG:
+            engine.add_exercise(exercise)
+        fn = lambda i: engine.process_frame(frames[i])
+        close = engine.close
+    else:
+        pose = mp.solutions.pose.Pose(**{**POSE_CONFIG, 'model_complexity': complexity})
+        results = []
+        fn = lambda i: results.append(pose.process(rgb[i]).pose_landmarks is not None)
+        close = pose.close
+
+    try:
+        times = time_stage(fn, len(frames), iterations, warmup)
+    finally:
+        close()
+    stats = summarize(times)
+    if complexity is not None:
+        # Frames without a person make MediaPipe run its detector every frame
+        stats['detected'] = round(sum(results[warmup:]) / iterations, 3)
+        if stats['detected'] < MIN_DETECTION_RATE:
+            print(f"Warning: pose detected in {stats['detected']:.0%} of frames", file=sys.stderr)
+    return stats
+
+def machine_info():
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'mediapipe': mp.__version__,
+    }
+
+def compare(results, baseline):
+    """Lines of p50 / p95 change against a baseline result file, per stage present in both"""
+    lines = [f"{'stage':<24} {'p50 ms':>9} {'base':>9} {'change':>8} {'p95 ms':>9} {'base':>9} {'change':>8}"]
+    for name, stats in results['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if not base or 'error' in stats or 'error' in base:
+            continue
+        cells = []
+        for key in ('p50_ms', 'p95_ms'):
+            change = (stats[key] / base[key] - 1) * 100 if base[key] else 0.0
+            cells.append(f"{stats[key]:>9.3f} {base[key]:>9.3f} {change:>+7.1f}%")
+        lines.append(f"{name:<24} " + " ".join(cells))
+    return "\n".join(lines)
+
+def format_results(results):
+    lines = [f"{'stage':<24} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'fps':>9}"]
+    for name, stats in results['stages'].items():
+        if 'error' in stats:
+            lines.append(f"{name:<24} error: {stats['error']}")
+            continue
+        lines.append(f"{name:<24} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} "
+                     f"{stats['p99_ms']:>9.3f} {stats['fps']:>9.1f}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time each stage of the frame pipeline separately (p50/p95/p99 latency and fps)")
+    parser.add_argument('--video', help="Take frames from this video instead of synthetic ones (recommended: "
+                                        "MediaPipe doesn't detect the synthetic stick figure)")
+    parser.add_argument('--recording', help="Take landmarks for the post-pose stages from this .plm recording")
+    parser.add_argument('--frames', type=int, default=120, help="Distinct frames cycled through")
+    parser.add_argument('--width', type=int, default=VIDEO_CONFIG['width'])
+    parser.add_argument('--height', type=int, default=VIDEO_CONFIG['height'])
+    parser.add_argument('--iterations', type=int, default=1000, help="Timed calls per non-model stage")
+    parser.add_argument('--pose-iterations', type=int, default=100, help="Timed calls per model stage")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--complexity', type=int, nargs='+', choices=[0, 1, 2], default=[0, 1, 2],
+                        help="pose.process model complexities to time")
+    parser.add_argument('--stages', nargs='+', help="Only run stages matching these names / wildcards")
+    parser.add_argument('--threads', type=int, help="cv2.setNumThreads for the run")
+    parser.add_argument('--output', help="Write the results to a .json file")
+    parser.add_argument('--compare', help="A previous --output file to compare p50 / p95 against")
+    args = parser.parse_args(argv)
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    if args.recording:
+        landmarks = recorded_landmarks(args.recording, args.frames)
+        if len(landmarks) == 0:
+            print(f"Error reading {args.recording}: no frames with a pose")
+            return 1
+    else:
+        landmarks = synthetic_landmarks(args.frames)
+
+    if args.video:
+        frames = video_frames(args.video, args.frames, args.width)
+        if not frames:
+            print(f"Error reading {args.video}: no frames")
+            return 1
+    else:
+        frames = synthetic_frames(landmarks, args.width, args.height)
+
+    # Same number of frames and landmark sets so stage i always pairs them
+    count = min(len(frames), len(landmarks))
+    frames, landmarks = frames[:count], np.ascontiguousarray(landmarks[:count])
+
+    stages = build_stages(frames, landmarks, args.complexity)
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': machine_info(),
+        'input': {
+            'frames': args.video or 'synthetic',
+            'landmarks': args.recording or 'synthetic',
+            'count': count,
+            'frame_shape': list(frames[0].shape),
+            'opencv_threads': cv2.getNumThreads(),
+        },
+        'stages': {},
+    }
+
+    for name, fn, model in stages:
+        if args.stages and not any(fnmatch.fnmatch(name, pattern) for pattern in args.stages):
+            continue
+        print(f"Timing {name}...", file=sys.stderr)
+        try:
+            if model:
+                stats = run_pose_stage(fn, frames, args.pose_iterations, args.warmup)
+            else:
+                stats = summarize(time_stage(fn, count, args.iterations, args.warmup))
+        except Exception as e:
+            # e.g. the heavy model can't be downloaded; keep timing the other stages
+            print(f"Error timing {name}: {e}")
+            stats = {'error': str(e)}
+        results['stages'][name] = stats
+
+    print(format_results(results))
+    undetected = [name for name, stats in results['stages'].items()
+                  if stats.get('detected', 1.0) < MIN_DETECTION_RATE]
+    if undetected:
+        print(f"\nWARNING: a pose was detected in less than {MIN_DETECTION_RATE:.0%} of frames for "
+              f"{', '.join(undetected)}; these timings (and pipeline_process_frame) mostly measure the "
+              f"person detector. Pass --video with a real clip for representative numbers.")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print("\n" + compare(results, json.load(f)))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
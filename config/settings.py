@@ -1,18 +1,194 @@
 # MediaPipe Pose Configuration
 POSE_CONFIG = {
+    'model_complexity': 1,
     'min_detection_confidence': 0.5,
     'min_tracking_confidence': 0.5
 }
 
-# Squat Detection Configuration
-SQUAT_CONFIG = {
-    'knee_angle_threshold': 120,
-    'stand_angle_threshold': 160
+# Exercise Definitions
+# Each exercise is counted from joint angles at the middle landmark of each
+# side's (a, b, c) triplet (MediaPipe PoseLandmark names). 'aggregate' is
+# 'mean' (average of all sides) or 'selected' (the sides picked with
+# selected_hand, all of them for 'Both', starting from default_side).
+# A rep is a hysteresis cycle: crossing 'arm' enters its stage, then crossing
+# 'rep' from there enters the rep stage and counts one rep. Thresholds are
+# 'above' or 'below' an angle in degrees. calories_per_rep is for 70 kg.
+EXERCISE_CONFIG = {
+    'Bicep Curls': {
+        'sides': {
+            'Right': ('RIGHT_SHOULDER', 'RIGHT_ELBOW', 'RIGHT_WRIST'),
+            'Left': ('LEFT_SHOULDER', 'LEFT_ELBOW', 'LEFT_WRIST'),
+        },
+        'aggregate': 'selected',
+        'default_side': 'Right',
+        'arm': {'above': 160, 'stage': 'down'},
+        'rep': {'below': 30, 'stage': 'up'},
+        'met': 3.5,
+        'calories_per_rep': 0.2
+    },
+    'Squats': {
+        'sides': {
+            'Right': ('RIGHT_HIP', 'RIGHT_KNEE', 'RIGHT_ANKLE'),
+            'Left': ('LEFT_HIP', 'LEFT_KNEE', 'LEFT_ANKLE'),
+        },
+        'aggregate': 'mean',
+        'arm': {'above': 160, 'stage': 'up'},
+        'rep': {'below': 90, 'stage': 'down'},
+        'met': 5.0,
+        'calories_per_rep': 0.32
+    },
+    'Lunges': {
+        'sides': {
+            'Right': ('RIGHT_HIP', 'RIGHT_KNEE', 'RIGHT_ANKLE'),
+            'Left': ('LEFT_HIP', 'LEFT_KNEE', 'LEFT_ANKLE'),
+        },
+        'aggregate': 'mean',
+        'arm': {'above': 160, 'stage': 'up'},
+        'rep': {'below': 110, 'stage': 'down'},
+        'met': 4.0,
+        'calories_per_rep': 0.3
+    },
+    'Shoulder Press': {
+        'sides': {
+            'Right': ('RIGHT_SHOULDER', 'RIGHT_ELBOW', 'RIGHT_WRIST'),
+            'Left': ('LEFT_SHOULDER', 'LEFT_ELBOW', 'LEFT_WRIST'),
+        },
+        'aggregate': 'selected',
+        'default_side': 'Both',
+        'arm': {'below': 90, 'stage': 'down'},
+        'rep': {'above': 160, 'stage': 'up'},
+        'met': 4.0,
+        'calories_per_rep': 0.25
+    }
 }
 
 # Video Processing Configuration
+# source is the camera index (or a video file / stream URL) the Workout page
+# opens; width/height/fps are requested from cameras; frames (or person crops)
+# wider than inference_width are downscaled before pose inference only, while
+# overlays are drawn at the full display resolution. None keeps native size.
+# Frames reach the browser as JPEG at jpeg_quality, at most display_width wide
+# and display_fps per second (0/None disables the cap).
 VIDEO_CONFIG = {
+    'source': 0,
     'width': 640,
     'height': 480,
-    'fps': 30
-} 
\ No newline at end of file
+    'fps': 30,
+    'inference_width': 480,
+    'display_width': 640,
+    'jpeg_quality': 70,
+    'display_fps': 20
+}
+
+# Pose Inference Scheduling
+# Full inference runs on keyframes only; frames in between reuse landmarks
+# extrapolated from the last two keyframes. keyframe_interval=1 disables skipping,
+# keyframe_period (seconds) switches to a time budget instead of a frame count.
+# roi_tracking runs inference on a padded crop around the last detected person.
+INFERENCE_CONFIG = {
+    'keyframe_interval': 1,
+    'keyframe_period': None,
+    'roi_tracking': False
+}
+
+# Workout Page UI Configuration
+# metrics_rate caps how often (per second) the Reps/Calories/Duration row is
+# refreshed; a metric is only re-sent when its displayed value changed.
+UI_CONFIG = {
+    'metrics_rate': 4
+}
+
+# Workout History Storage
+# SQLite file (relative paths are resolved from the project root), the user id
+# used while the app has no login, and how many days the History page charts.
+HISTORY_CONFIG = {
+    'db_path': 'data/workout_history.db',
+    'default_user': 'local',
+    'chart_days': 30,
+    'recent_limit': 5
+}
+
+# Per-session Angle Trace
+# Ring buffer sizes: capacity frames of joint angles (about 10 minutes at
+# 30 fps) and transition_capacity stage changes; older entries are overwritten.
+TRACE_CONFIG = {
+    'capacity': 18000,
+    'transition_capacity': 4096
+}
+
+# Landmark Recording
+# Where the Workout page writes session landmark recordings (.plm, replayable
+# with replay_session.py); relative paths are resolved from the project root.
+RECORDING_CONFIG = {
+    'directory': 'data/recordings'
+}
+
+# Group (Multi-Person) Mode
+# Up to max_people people are tracked, each with their own pose graph run on
+# a crop around them. The HOG person detector runs every detect_interval
+# frames on a copy detection_width wide, to pick up new or lost people; a
+# person is dropped after max_missed frames without a pose. Detections match
+# tracked people when their boxes overlap by iou_threshold, and two tracks
+# overlapping by duplicate_iou are merged.
+MULTI_PERSON_CONFIG = {
+    'max_people': 4,
+    'detect_interval': 15,
+    'detection_width': 480,
+    'max_missed': 45,
+    'iou_threshold': 0.3,
+    'duplicate_iou': 0.6
+}
+
+# Multi-Stream Stations
+# Camera indices, files or URLs processed side by side (one process per
+# stream, see multi_stream.py and the Stations page). pin_cores pins each
+# station's process to its own CPU core, round-robin; stations report their
+# FPS, latency and counters every report_interval seconds.
+STREAMS_CONFIG = {
+    'sources': [0, 1],
+    'pin_cores': True,
+    'report_interval': 1.0
+}
+
+# Live Stage Timing
+# The Workout page's Performance panel keeps the last window samples of each
+# pipeline stage (capture, color, inference, drawing, display) and refreshes
+# its FPS / p50 / p95 table every refresh seconds.
+TIMING_CONFIG = {
+    'window': 300,
+    'refresh': 1.0
+}
+
+# Landmark Smoothing
+# Optional One Euro filter applied to every landmark before angles are
+# computed (PoseEngine(smoothing=True) or enabled here), which keeps the
+# jitter of model_complexity 0 from double counting. min_cutoff (Hz) sets
+# how steady still joints are, beta how quickly the cutoff rises with speed
+# (normalized image widths per second) and d_cutoff smooths that speed.
+# frequency is the assumed frame rate when frames carry no timestamps.
+LANDMARK_FILTER_CONFIG = {
+    'enabled': False,
+    'min_cutoff': 2.0,
+    'beta': 10.0,
+    'd_cutoff': 1.0,
+    'frequency': 30
+}
+
+# Pose Engine Pool
+# Sessions lease a pose engine from one process-wide pool while their camera
+# runs; at most max_engines exist. `warm` idle engines are kept built and
+# warmed (one dummy frame through the graph) in the background from the
+# server's first page run, so Start Camera doesn't wait for MediaPipe's
+# import and graph start-up. Other idle engines are closed after
+# idle_timeout seconds. A lease not touched for lease_timeout seconds (the
+# tab went away) is released along with its camera; lease_wait is how long
+# Start Camera waits for a free engine when the pool is full. The pool's
+# thread checks every interval seconds.
+ENGINE_POOL_CONFIG = {
+    'max_engines': 4,
+    'warm': 1,
+    'idle_timeout': 300,
+    'lease_timeout': 30,
+    'lease_wait': 5.0,
+    'interval': 1.0
+}
@@ -0,0 +1,346 @@
+import time
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from config.settings import EXERCISE_CONFIG
+from utils.angle_trace import ASYNC_STAGE, AngleTrace
+from utils.angles import NUM_LANDMARKS, joint_angles, landmarks_to_array
+from utils.helpers import reuse_buffer
+from utils.overlay import OverlayRenderer
+
+PoseLandmark = mp.solutions.pose.PoseLandmark
+
+# Per-side stage codes; names come from each definition's 'arm'/'rep' stage
+STAGE_NONE, STAGE_ARMED, STAGE_REP = 0, 1, 2
+COUNT_MAX = np.iinfo(np.int64).max
+
+def _threshold(spec):
+    # (sign, signed threshold): the condition holds when sign * angle > signed threshold
+    if 'above' in spec:
+        return 1.0, float(spec['above'])
+    return -1.0, -float(spec['below'])
+
+class ExerciseEngine:
+    """Rep state machines for data-defined exercises, stepped together once per frame.
+
+    Definitions (see EXERCISE_CONFIG) are compiled into flat arrays: one
+    joint triplet per side, a sign and threshold per exercise for arming and
+    for counting, and per-side stage and rep-count state. update() computes
+    every joint angle with a single joint_angles call and advances all
+    active exercises with array operations, so a new exercise is a new
+    definition rather than a new per-frame code path.
+    """
+
+    def __init__(self, names=None, definitions=None):
+        definitions = definitions or EXERCISE_CONFIG
+        self.names = list(definitions) if names is None else list(names)
+        self.definitions = {name: definitions[name] for name in self.names}
+        self.index = {name: i for i, name in enumerate(self.names)}
+        count = len(self.names)
+        max_sides = max(len(d['sides']) for d in self.definitions.values())
+
+        # Exercise e, side s uses triplets[side_rows[e, s]] where valid[e, s]
+        triplets = []
+        self.side_names = []
+        self.side_rows = np.zeros((count, max_sides), dtype=np.intp)
+        self.valid = np.zeros((count, max_sides), dtype=bool)
+        for e, definition in enumerate(self.definitions.values()):
+            self.side_names.append(list(definition['sides']))
+            for s, joints in enumerate(definition['sides'].values()):
+                self.side_rows[e, s] = len(triplets)
+                self.valid[e, s] = True
+                triplets.append([PoseLandmark[joint].value for joint in joints])
+        self.triplets = np.array(triplets)
+
+        self.mean_mode = np.array([d['aggregate'] == 'mean' for d in self.definitions.values()])
+        self.arm_sign, self.arm_threshold = np.array(
+            [_threshold(d['arm']) for d in self.definitions.values()]).T
+        self.rep_sign, self.rep_threshold = np.array(
+            [_threshold(d['rep']) for d in self.definitions.values()]).T
+        self.stage_names = [[None, d['arm']['stage'], d['rep']['stage']]
+                            for d in self.definitions.values()]
+
+        self.stages = np.zeros((count, max_sides), dtype=np.int8)
+        self.counts = np.zeros((count, max_sides), dtype=np.int64)
+        self.counters = np.zeros(count, dtype=np.int64)
+        # Latest angles and side selection, for overlays and traces
+        self.angles = np.full((count, max_sides), np.nan, dtype=np.float32)
+        self.selected = self.valid.copy()
+        self._plans = {}
+
+    def _side_mask(self, e, side):
+        if self.mean_mode[e]:
+            return self.valid[e]
+        side = side or self.definitions[self.names[e]].get('default_side', 'Both')
+        if side not in self.side_names[e]:
+            return self.valid[e]
+        mask = np.zeros_like(self.valid[e])
+        mask[self.side_names[e].index(side)] = True
+        return mask
+
+    def plan(self, names=None, sides=None):
+        """Precomputed arrays for stepping `names` with their selected_hand, cached per combination"""
+        names = self.names if names is None else names
+        sides = sides or {}
+        key = tuple((name, sides.get(name)) for name in names)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = _Plan(self, names, sides)
+        return plan
+
+    def signals(self, angles, plan):
+        """Signed (arm, rep) values, each (..., E), of (..., E, S) side angles.
+
+        Each exercise's condition holds when its value exceeds its signed
+        threshold. 'mean' exercises use the average over their sides; the
+        others need every selected side past the threshold, i.e. the minimum.
+        """
+        mean = (angles * plan.weights).sum(axis=-1)
+        signed = plan.signs[..., None] * angles[..., None, :, :]
+        every_side = np.where(plan.selected, signed, np.inf).min(axis=-1)
+        values = np.where(plan.mean_mode, plan.signs * mean[..., None, :], every_side)
+        return values[..., 0, :], values[..., 1, :]
+
+    def update(self, landmarks, names=None, sides=None):
+        """Advance the named exercises (all when None) by one frame of (33, 4) landmarks.
+
+        `sides` maps an exercise name to its selected_hand. Returns a boolean
+        array, aligned with names, of exercises that completed a rep.
+        """
+        plan = self.plan(names, sides)
+        angles = joint_angles(landmarks, plan.triplets).reshape(plan.shape)
+        arm, rep = self.signals(angles, plan)
+        idx, selected = plan.idx, plan.selected
+
+        stages = self.stages[idx]
+        stages[selected & (arm > plan.arm_threshold)[:, None]] = STAGE_ARMED
+        # A rep needs every selected side armed beforehand
+        fired = (rep > plan.rep_threshold) & ((stages == STAGE_ARMED) | ~selected).all(axis=1)
+        fired_sides = selected & fired[:, None]
+        stages[fired_sides] = STAGE_REP
+
+        self.stages[idx] = stages
+        counts = self.counts[idx] + fired_sides
+        self.counts[idx] = counts
+        self.counters[idx] = np.where(selected, counts, COUNT_MAX).min(axis=1)
+        self.angles[idx] = angles
+        self.selected[idx] = selected
+        return fired
+
+    def counter(self, name):
+        return int(self.counters[self.index[name]])
+
+    def stage(self, name):
+        e = self.index[name]
+        codes = self.stages[e][self.selected[e]]
+        if len(codes) == 0 or (codes != codes[0]).any():
+            return ASYNC_STAGE
+        return self.stage_names[e][codes[0]]
+
+    def reset(self, name):
+        e = self.index[name]
+        self.stages[e] = STAGE_NONE
+        self.counts[e] = 0
+        self.counters[e] = 0
+
+class _Plan:
+    # The slices of an engine's arrays one update() call needs, so the
+    # per-frame path does no indexing by name
+    def __init__(self, engine, names, sides):
+        self.idx = np.array([engine.index[name] for name in names], dtype=np.intp)
+        self.shape = (len(names), engine.valid.shape[1])
+        self.selected = np.array([engine._side_mask(e, sides.get(name))
+                                  for e, name in zip(self.idx, names)]).reshape(self.shape)
+        self.triplets = engine.triplets[engine.side_rows[self.idx].ravel()]
+
+        valid = engine.valid[self.idx]
+        self.weights = (valid / valid.sum(axis=1, keepdims=True)).astype(np.float32)
+        self.mean_mode = engine.mean_mode[self.idx]
+        self.signs = np.stack((engine.arm_sign[self.idx], engine.rep_sign[self.idx]))
+        self.arm_threshold = engine.arm_threshold[self.idx]
+        self.rep_threshold = engine.rep_threshold[self.idx]
+
+class ExerciseCounter:
+    """One exercise of an ExerciseEngine, with the rep counter interface PoseEngine uses.
+
+    process_landmarks() steps just this exercise; PoseEngine instead steps
+    every active exercise of a shared engine at once and then calls
+    finish_frame() on each counter for its trace and overlays.
+    """
+
+    def __init__(self, engine, name, pose=None):
+        self.engine = engine
+        self.name = name
+        self.definition = engine.definitions[name]
+        self._index = engine.index[name]
+        valid = engine.valid[self._index]
+        rows = engine.side_rows[self._index][valid]
+        # Sides fill each row from the left, so these are live views of the
+        # engine's latest angles and selection, not per-frame copies
+        sides = int(valid.sum())
+        self._angles = engine.angles[self._index, :sides]
+        self._selected = engine.selected[self._index, :sides]
+        # Landmarks drawn when the skeleton is limited to the exercise's joints
+        self.JOINTS = np.unique(engine.triplets[rows])
+        self._mids = engine.triplets[rows, 1]
+        self.MET = self.definition['met']
+
+        self.mp_pose = mp.solutions.pose
+        self.mp_drawing = mp.solutions.drawing_utils
+        # Only built when process_frame is used standalone; a PoseEngine
+        # runs inference once and hands landmarks over instead
+        self.pose = pose
+        self.landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self._rgb = None
+        self.overlay = OverlayRenderer()
+        # Every frame's joint angles and stage changes for this session
+        self.trace = AngleTrace([PoseLandmark(mid).name.lower() for mid in self._mids],
+                                stages=engine.stage_names[self._index][1:] + [ASYNC_STAGE])
+        self._traced_stage = None
+        self.start_time = time.time()
+        # Optional StageTimer and LandmarkFilter for standalone process_frame calls
+        self.timer = None
+        self.filter = None
+
+    @property
+    def counter(self):
+        return self.engine.counter(self.name)
+
+    @property
+    def stage(self):
+        return self.engine.stage(self.name)
+
+    def calculate_calories(self, weight_kg, elapsed_time_hrs):
+        return self.MET * weight_kg * elapsed_time_hrs
+
+    def calories_per_rep(self, weight_kg):
+        return self.definition['calories_per_rep'] * (weight_kg / 70)
+
+    def reset_counter(self):
+        self.engine.reset(self.name)
+        self.trace.reset()
+        self._traced_stage = None
+        self.start_time = time.time()
+
+    def get_pose(self):
+        if self.pose is None:
+            self.pose = self.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        return self.pose
+
+    def process_frame(self, frame, show_angles=True, show_counter=True, weight_kg=70, selected_hand=None,
+                      in_place=False):
+        """Run the model on a BGR frame and count; overlays go onto frame itself with in_place"""
+        if frame is None:
+            return None
+
+        try:
+            # Convert BGR to RGB in a reused buffer; the read-only view is
+            # referenced by MediaPipe instead of copied
+            start = time.perf_counter()
+            self._rgb = reuse_buffer(self._rgb, frame.shape)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            rgb = self._rgb.view()
+            rgb.flags.writeable = False
+
+            # Make detection
+            converted = time.perf_counter()
+            results = self.get_pose().process(rgb)
+            inferred = time.perf_counter()
+
+            # Draw on the BGR frame, no conversion back
+            image = frame if in_place else frame.copy()
+
+            if results.pose_landmarks:
+                # Draw landmarks
+                self.mp_drawing.draw_landmarks(
+                    image,
+                    results.pose_landmarks,
+                    self.mp_pose.POSE_CONNECTIONS,
+                    self.mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
+                    self.mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
+                )
+
+                landmarks = landmarks_to_array(results.pose_landmarks, self.landmarks)
+                if self.filter is not None:
+                    landmarks = self.filter(landmarks)
+                self.process_landmarks(image, landmarks,
+                                       show_angles=show_angles,
+                                       show_counter=show_counter,
+                                       weight_kg=weight_kg,
+                                       selected_hand=selected_hand)
+            elif self.filter is not None:
+                self.filter.reset()
+
+            if self.timer is not None:
+                self.timer.add('color', converted - start, converted)
+                self.timer.add('inference', inferred - converted, inferred)
+                self.timer.since('drawing', inferred)
+            return image
+
+        except Exception as e:
+            print(f"Error in process_frame: {e}")
+            return frame
+
+    def process_landmarks(self, image, landmarks, show_angles=True, show_counter=True, weight_kg=70, selected_hand=None):
+        """Update the rep counter from one frame's landmarks and draw onto image"""
+        try:
+            self.engine.update(landmarks, [self.name], {self.name: selected_hand})
+        except Exception as e:
+            print(f"Error processing landmarks: {e}")
+            return
+        self.finish_frame(image, landmarks, show_angles=show_angles, show_counter=show_counter)
+
+    def finish_frame(self, image, landmarks, show_angles=True, show_counter=True, **options):
+        """Trace and draw this exercise after the engine has been updated for the frame"""
+        try:
+            angles = self._angles
+            stage = self.stage
+
+            # Trace this frame for tempo / range-of-motion analysis
+            now = time.time() - self.start_time
+            self.trace.record(now, angles)
+            if stage != self._traced_stage:
+                self.trace.mark_stage(now, stage, self.counter)
+                self._traced_stage = stage
+
+            if image is None:
+                return
+
+            if show_angles:
+                # Overlay positions scale with the image actually drawn on
+                image_size = (image.shape[1], image.shape[0])
+                for angle, mid, selected in zip(angles, self._mids, self._selected):
+                    if selected:
+                        self.overlay.draw_label(image, str(int(angle)), np.multiply(landmarks[mid, :2], image_size))
+
+            if show_counter:
+                # Counter box is a cached sprite, re-rendered only when it changes
+                self.overlay.draw_counter(image, self.counter, stage)
+
+        except Exception as e:
+            print(f"Error processing landmarks: {e}")
+
+def count_frame(counters, image, landmarks, names, options=None, show_counter=True):
+    """Hand one frame's landmarks to the named counters.
+
+    Counters that share an ExerciseEngine are stepped together in one
+    vectorized pass; any other counter processes the landmarks itself. Only
+    the first name draws its counter box so overlays don't stack.
+    """
+    options = options or {}
+    engines = {}
+    for name in names:
+        engine = getattr(counters[name], 'engine', None)
+        if isinstance(engine, ExerciseEngine):
+            engines.setdefault(id(engine), (engine, []))[1].append(name)
+    for engine, shared in engines.values():
+        engine.update(landmarks, shared, {name: options.get(name, {}).get('selected_hand') for name in shared})
+
+    for i, name in enumerate(names):
+        counter = counters[name]
+        kwargs = dict(options.get(name, {}), show_counter=show_counter and i == 0)
+        if isinstance(getattr(counter, 'engine', None), ExerciseEngine):
+            counter.finish_frame(image, landmarks, **kwargs)
+        else:
+            counter.process_landmarks(image, landmarks, **kwargs)
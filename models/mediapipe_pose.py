@@ -1,6 +1,7 @@
 import mediapipe as mp
 import cv2
-import numpy as np
+
+from utils.helpers import reuse_buffer
 
 class MediaPipePoseModel:
     def __init__(self):
@@ -10,16 +11,21 @@ class MediaPipePoseModel:
             min_tracking_confidence=0.5
         )
         self.mp_drawing = mp.solutions.drawing_utils
+        # RGB model input, reused while the frame size stays the same
+        self._rgb = None
         
-    def detect_pose(self, frame):
-        # Convert BGR to RGB
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def detect_pose(self, frame, in_place=False):
+        # Convert BGR to RGB into the reused buffer
+        self._rgb = reuse_buffer(self._rgb, frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
         
-        # Process the frame and detect poses
-        results = self.pose.process(image)
+        # Process the frame and detect poses; a read-only view is referenced, not copied
+        rgb = self._rgb.view()
+        rgb.flags.writeable = False
+        results = self.pose.process(rgb)
         
-        # Convert back to BGR for OpenCV
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        # Draw on the BGR frame itself (or a copy) instead of converting back
+        image = frame if in_place else frame.copy()
         
         if results.pose_landmarks:
             # Draw pose landmarks
@@ -29,4 +35,4 @@ class MediaPipePoseModel:
                 self.mp_pose.POSE_CONNECTIONS
             )
             
-        return image, results.pose_landmarks 
\ No newline at end of file
+        return image, results.pose_landmarks 
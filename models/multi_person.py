@@ -0,0 +1,190 @@
+import time
+
+from config.settings import EXERCISE_CONFIG, MULTI_PERSON_CONFIG
+from models.exercise_engine import count_frame
+from models.pose_engine import PoseEngine
+from utils.drawing import draw_skeleton
+from utils.overlay import OverlayRenderer
+from utils.person_tracking import PersonDetector, box_iou, match_boxes
+
+class TrackedPerson:
+    """One tracked person: a stable id, their own PoseEngine (pose graph, crop and counters)"""
+
+    def __init__(self, person_id, engine):
+        self.id = person_id
+        self.engine = engine
+        self.landmarks = None
+        self.last_box = engine.roi.box
+        self.missed = 0
+
+    @property
+    def box(self):
+        return self.engine.roi.box
+
+class MultiPersonEngine:
+    """Counts reps for several people in front of one camera.
+
+    Each person gets their own PoseEngine with ROI tracking, so the single-person
+    pose model runs once per person on a crop around them and per-frame cost
+    grows with the number of people. A HOG person detector runs every
+    detect_interval frames to start new tracks and re-seed people whose
+    tracking was lost; detections are matched to tracks by box overlap so
+    ids (and counters) stay with the same person.
+    """
+
+    def __init__(self, max_people=None, exercises=None, detect_interval=None, detector=None, **pose_kwargs):
+        self.max_people = max_people or MULTI_PERSON_CONFIG['max_people']
+        self.detect_interval = detect_interval or MULTI_PERSON_CONFIG['detect_interval']
+        self.max_missed = MULTI_PERSON_CONFIG['max_missed']
+        self.iou_threshold = MULTI_PERSON_CONFIG['iou_threshold']
+        self.duplicate_iou = MULTI_PERSON_CONFIG['duplicate_iou']
+        self.exercises = list(EXERCISE_CONFIG) if exercises is None else list(exercises)
+        self.detector = detector or PersonDetector(width=MULTI_PERSON_CONFIG['detection_width'])
+        self.pose_kwargs = pose_kwargs
+
+        self.people = []
+        # Engines of people who left, kept so their pose graphs can be reused
+        self._idle = []
+        self._next_id = 1
+        self._frames_since_detection = None
+        self.exercise_joints_only = False
+        self.overlay = OverlayRenderer()
+        # Optional StageTimer, shared with every person's engine
+        self.timer = None
+
+    def _engine(self):
+        if self._idle:
+            engine = self._idle.pop()
+            engine.reset()
+            engine.timer = self.timer
+            for counter in engine.counters.values():
+                counter.reset_counter()
+            return engine
+
+        engine = PoseEngine(roi_tracking=True, **self.pose_kwargs)
+        engine.timer = self.timer
+        for name in self.exercises:
+            engine.add_exercise(name)
+        return engine
+
+    def _detect(self, frame):
+        boxes = self.detector.detect(frame, self.max_people)
+        tracked = [person.box or person.last_box for person in self.people]
+        matched = set()
+        for p, d in match_boxes(tracked, boxes, self.iou_threshold):
+            matched.add(d)
+            person = self.people[p]
+            if person.box is None:
+                # Tracking was lost; pick the person up again from the detection
+                person.engine.roi.seed(boxes[d])
+
+        for d in range(len(boxes)):
+            if d in matched or len(self.people) >= self.max_people:
+                continue
+            engine = self._engine()
+            engine.roi.seed(boxes[d])
+            self.people.append(TrackedPerson(self._next_id, engine))
+            self._next_id += 1
+
+    def _drop_duplicates(self):
+        # Two crops that converged on the same person: the newer track gives way
+        active = [person for person in self.people if person.box is not None]
+        if len(active) < 2:
+            return
+        iou = box_iou([person.box for person in active], [person.box for person in active])
+        for i in range(len(active)):
+            for j in range(i + 1, len(active)):
+                if iou[i, j] > self.duplicate_iou and active[i].box is not None:
+                    active[j].engine.roi.reset()
+
+    def track(self, frame):
+        """Detect/track people for one frame; returns the people that have landmarks"""
+        if self._frames_since_detection is None or self._frames_since_detection >= self.detect_interval:
+            self._detect(frame)
+            self._frames_since_detection = 0
+        self._frames_since_detection += 1
+
+        for person in self.people:
+            # Without a box the crop would be the whole frame, i.e. whoever is most visible
+            person.landmarks = person.engine.estimate(frame) if person.box is not None else None
+            if person.landmarks is None:
+                person.missed += 1
+            else:
+                person.missed = 0
+                person.last_box = person.box
+        self._drop_duplicates()
+
+        for person in [p for p in self.people if p.missed > self.max_missed]:
+            self.people.remove(person)
+            self._idle.append(person.engine)
+
+        return [person for person in self.people if person.landmarks is not None]
+
+    def process_frame(self, frame, active=None, show_landmarks=True, show_counter=True, options=None,
+                      in_place=False):
+        """Like PoseEngine.process_frame, for everyone in view; each person is labelled with id and reps"""
+        if frame is None:
+            return None
+
+        try:
+            people = self.track(frame)
+            start = time.perf_counter()
+            image = frame if in_place else frame.copy()
+            names = self.exercises if active is None else active
+            h, w = image.shape[:2]
+
+            for person in people:
+                if show_landmarks:
+                    if self.exercise_joints_only:
+                        joints, connections = person.engine._skeleton(names)
+                        draw_skeleton(image, person.landmarks, connections, joints=joints)
+                    else:
+                        draw_skeleton(image, person.landmarks)
+
+                count_frame(person.engine.counters, image, person.landmarks, names, options, show_counter=False)
+
+                if show_counter and names:
+                    x0, y0 = person.box[:2] if person.box is not None else person.last_box[:2]
+                    reps = person.engine.counters[names[0]].counter
+                    self.overlay.draw_label(image, f"#{person.id}: {reps}", (x0 * w + 4, y0 * h + 16))
+
+            if self.timer is not None:
+                self.timer.since('drawing', start)
+            return image
+
+        except Exception as e:
+            print(f"Error in multi-person engine: {e}")
+            return frame
+
+    def update(self, frame, active=None, options=None):
+        """Count reps for everyone in one frame without drawing; returns how many people had a pose"""
+        people = self.track(frame)
+        names = self.exercises if active is None else active
+        options = {name: dict((options or {}).get(name, {}), show_angles=False) for name in names}
+        for person in people:
+            count_frame(person.engine.counters, None, person.landmarks, names, options, show_counter=False)
+        return len(people)
+
+    def snapshot(self):
+        """Group totals per exercise, like PoseEngine.snapshot, plus 'people': {id: per-person snapshot}"""
+        people = {person.id: person.engine.snapshot() for person in self.people}
+        state = {name: {'counter': sum(p[name]['counter'] for p in people.values()), 'stage': None}
+                 for name in self.exercises}
+        state['people'] = people
+        return state
+
+    def reset_counter(self, name):
+        for person in self.people:
+            person.engine.reset_counter(name)
+
+    def reset(self):
+        """Forget everyone, e.g. before an unrelated video"""
+        self._idle.extend(person.engine for person in self.people)
+        self.people = []
+        self._frames_since_detection = None
+
+    def close(self):
+        for engine in self._idle + [person.engine for person in self.people]:
+            engine.close()
+        self._idle = []
+        self.people = []
@@ -0,0 +1,276 @@
+import time
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from config.settings import INFERENCE_CONFIG, LANDMARK_FILTER_CONFIG, POSE_CONFIG, VIDEO_CONFIG
+from models.exercise_engine import ExerciseCounter, ExerciseEngine, count_frame
+from utils.angles import NUM_LANDMARKS, landmarks_to_array
+from utils.drawing import POSE_CONNECTIONS, draw_skeleton, skeleton_subset
+from utils.helpers import reuse_buffer
+from utils.landmark_filter import LandmarkFilter
+from utils.landmark_recording import LandmarkRecorder
+from utils.roi import PersonROI
+
+class PoseEngine:
+    """Runs pose inference once per frame and shares the result with every registered counter"""
+
+    def __init__(self, keyframe_interval=None, keyframe_period=None, roi_tracking=None,
+                 inference_width=-1, smoothing=None, **pose_kwargs):
+        self.mp_pose = mp.solutions.pose
+        self.pose = self.mp_pose.Pose(**{**POSE_CONFIG, **pose_kwargs})
+        self.counters = {}
+        # Shared state machines for counters added with add_exercise
+        self.exercises = None
+        self.results = None
+        # Landmarks of the latest frame, converted once and shared by all counters
+        self.landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+
+        # Keyframe scheduling: run the model every keyframe_interval frames, or
+        # every keyframe_period seconds when that is set
+        self.keyframe_interval = keyframe_interval or INFERENCE_CONFIG['keyframe_interval']
+        self.keyframe_period = keyframe_period if keyframe_period is not None else INFERENCE_CONFIG['keyframe_period']
+        self._keyframes = np.zeros((2, NUM_LANDMARKS, 4), dtype=np.float32)
+        self._keyframe_times = [0.0, 0.0]
+        self._keyframe_count = 0
+        self._frames_since_keyframe = 0
+
+        # Optional crop around the person tracked in the previous keyframe
+        if roi_tracking is None:
+            roi_tracking = INFERENCE_CONFIG['roi_tracking']
+        self.roi = PersonROI() if roi_tracking else None
+
+        # Model input width, independent of the display size; -1 means use VIDEO_CONFIG
+        self.inference_width = VIDEO_CONFIG['inference_width'] if inference_width == -1 else inference_width
+
+        # Draw only the joints the active exercises use instead of the full skeleton
+        self.exercise_joints_only = False
+        self._skeletons = {}
+
+        # Optional One Euro smoothing of the landmarks before any angle is computed
+        if smoothing is None:
+            smoothing = LANDMARK_FILTER_CONFIG['enabled']
+        self.filter = LandmarkFilter() if smoothing else None
+
+        # Optional LandmarkRecorder that receives every frame's landmarks
+        self.recorder = None
+        # Optional StageTimer that receives color / inference / drawing latencies
+        self.timer = None
+
+        # Model input buffers, reused while the crop / frame size stays the same
+        self._resized = None
+        self._rgb = None
+
+    def register(self, name, counter):
+        self.counters[name] = counter
+        self._skeletons.clear()
+        return counter
+
+    def add_exercise(self, name):
+        """Register a counter for an EXERCISE_CONFIG exercise on the shared ExerciseEngine"""
+        if self.exercises is None:
+            self.exercises = ExerciseEngine()
+        return self.register(name, ExerciseCounter(self.exercises, name))
+
+    def unregister(self, name):
+        self._skeletons.clear()
+        return self.counters.pop(name, None)
+
+    def detect(self, frame):
+        # Single BGR->RGB conversion and single model call per frame
+        start = time.perf_counter()
+        if self.roi is not None:
+            frame = self.roi.crop(frame)
+        # Landmarks are normalized, so downscaling needs no coordinate mapping
+        h, w = frame.shape[:2]
+        if self.inference_width and w > self.inference_width:
+            size = (self.inference_width, int(h * self.inference_width / w))
+            self._resized = reuse_buffer(self._resized, (size[1], size[0], 3))
+            frame = cv2.resize(frame, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        self._rgb = reuse_buffer(self._rgb, frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        # A read-only view lets MediaPipe reference the buffer instead of copying it
+        image = self._rgb.view()
+        image.flags.writeable = False
+        if self.timer is not None:
+            start = self.timer.since('color', start)
+        self.results = self.pose.process(image)
+        if self.timer is not None:
+            self.timer.since('inference', start)
+        return self.results
+
+    def reset(self):
+        """Forget tracking and keyframe history, e.g. before an unrelated video"""
+        self.pose.reset()
+        if self.roi is not None:
+            self.roi.reset()
+        if self.filter is not None:
+            self.filter.reset()
+        self._keyframe_count = 0
+        self._frames_since_keyframe = 0
+
+    def warm_up(self, frame=None):
+        """Run one blank frame through the model so the first real frame doesn't pay for graph start-up.
+
+        A blank frame has no pose, so there is no tracking state to reset
+        afterwards (pose.reset() would restart the graph and undo the warm-up).
+        """
+        if frame is None:
+            frame = np.zeros((VIDEO_CONFIG['height'], VIDEO_CONFIG['width'], 3), dtype=np.uint8)
+        self.detect(frame)
+        self.results = None
+
+    def start_recording(self, path):
+        """Record the landmarks handed to the counters, one record per frame"""
+        self.stop_recording()
+        self.recorder = LandmarkRecorder(path)
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def _skeleton(self, names):
+        # (joints, connections) for the active counters, cached per combination
+        key = tuple(names)
+        if key not in self._skeletons:
+            joints = [getattr(self.counters[name], 'JOINTS', None) for name in names]
+            if not joints or any(j is None for j in joints):
+                self._skeletons[key] = (None, POSE_CONNECTIONS)
+            else:
+                joints = np.unique(np.concatenate(joints))
+                self._skeletons[key] = (joints, skeleton_subset(joints))
+        return self._skeletons[key]
+
+    def _is_keyframe(self, now):
+        if self._keyframe_count == 0:
+            return True
+        if self.keyframe_period:
+            return now - self._keyframe_times[1] >= self.keyframe_period
+        return self._frames_since_keyframe >= self.keyframe_interval
+
+    def _extrapolation_ratio(self, now):
+        # Time based under a period budget, frame based otherwise so offline
+        # runs that go faster than real time extrapolate the same way
+        if self.keyframe_period:
+            gap = self._keyframe_times[1] - self._keyframe_times[0]
+            return min((now - self._keyframe_times[1]) / gap, 1.0) if gap > 0 else 0.0
+        return min(self._frames_since_keyframe / self.keyframe_interval, 1.0)
+
+    def estimate(self, frame):
+        """Return this frame's (33, 4) landmark array, or None when no pose is tracked.
+
+        On keyframes the model runs; in between, landmarks are extrapolated
+        linearly from the last two keyframes so counters see a continuous signal.
+        With a filter, the result is smoothed before it is recorded or counted.
+        """
+        landmarks = self._estimate(frame)
+        if self.filter is not None:
+            if landmarks is None:
+                self.filter.reset()
+            else:
+                # Timed like extrapolation: real time under a period budget, frames otherwise
+                landmarks = self.filter(landmarks, time.perf_counter() if self.keyframe_period else None)
+        if self.recorder is not None:
+            self.recorder.write(time.time(), landmarks)
+        return landmarks
+
+    def _estimate(self, frame):
+        now = time.perf_counter()
+        self._frames_since_keyframe += 1
+        if self._is_keyframe(now):
+            self._frames_since_keyframe = 0
+            results = self.detect(frame)
+            if not results.pose_landmarks:
+                self._keyframe_count = 0
+                if self.roi is not None:
+                    self.roi.reset()
+                return None
+
+            # Shift the newest keyframe into the "previous" slot
+            self._keyframes[0] = self._keyframes[1]
+            self._keyframe_times[0] = self._keyframe_times[1]
+            landmarks_to_array(results.pose_landmarks, self._keyframes[1])
+            if self.roi is not None:
+                self.roi.to_frame(self._keyframes[1])
+                self.roi.update(self._keyframes[1])
+            self._keyframe_times[1] = now
+            self._keyframe_count += 1
+            self.landmarks[:] = self._keyframes[1]
+            return self.landmarks
+
+        if self._keyframe_count < 2:
+            # Only one keyframe so far: hold it
+            self.landmarks[:] = self._keyframes[1]
+            return self.landmarks
+
+        # Extrapolate at most one keyframe gap ahead to avoid overshooting
+        ratio = self._extrapolation_ratio(now)
+        np.subtract(self._keyframes[1], self._keyframes[0], out=self.landmarks)
+        self.landmarks *= ratio
+        self.landmarks += self._keyframes[1]
+        self.landmarks[:, 3] = self._keyframes[1, :, 3]
+        return self.landmarks
+
+    def process_frame(self, frame, active=None, show_landmarks=True, show_counter=True, options=None,
+                      in_place=False):
+        """Estimate the pose and hand the landmarks to each active counter.
+
+        `active` is a list of registered counter names (all counters when None) and
+        `options` maps a counter name to extra keyword arguments for that counter.
+        Only the first active counter draws its counter box so overlays don't stack.
+        With in_place, overlays are drawn straight onto frame instead of a copy.
+        """
+        if frame is None:
+            return None
+
+        try:
+            landmarks = self.estimate(frame)
+            start = time.perf_counter()
+            image = frame if in_place else frame.copy()
+
+            if landmarks is not None:
+                names = list(self.counters) if active is None else active
+                if show_landmarks:
+                    if self.exercise_joints_only:
+                        joints, connections = self._skeleton(names)
+                        draw_skeleton(image, landmarks, connections, joints=joints)
+                    else:
+                        draw_skeleton(image, landmarks)
+
+                count_frame(self.counters, image, landmarks, names, options, show_counter)
+
+            if self.timer is not None:
+                self.timer.since('drawing', start)
+            return image
+
+        except Exception as e:
+            print(f"Error in pose engine: {e}")
+            return frame
+
+    def update(self, frame, active=None, options=None):
+        """Count reps for one frame without drawing anything (headless use).
+
+        Returns True when a pose was detected.
+        """
+        landmarks = self.estimate(frame)
+        if landmarks is None:
+            return False
+
+        names = list(self.counters) if active is None else active
+        options = {name: dict((options or {}).get(name, {}), show_angles=False) for name in names}
+        count_frame(self.counters, None, landmarks, names, options, show_counter=False)
+        return True
+
+    def snapshot(self):
+        """{name: {'counter', 'stage'}} for every registered counter"""
+        return {name: {'counter': counter.counter, 'stage': counter.stage}
+                for name, counter in self.counters.items()}
+
+    def reset_counter(self, name):
+        self.counters[name].reset_counter()
+
+    def close(self):
+        self.stop_recording()
+        self.pose.close()
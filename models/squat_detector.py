@@ -1,55 +1,45 @@
 import numpy as np
-import cv2
-import mediapipe as mp
+
+from models.exercise_engine import ExerciseEngine
+from utils.angles import NUM_LANDMARKS, calculate_angle, landmarks_to_array
+
+# Left hip-knee-ankle squat: stand above 160 degrees, count below 100
+DEFINITION = {
+    'Squats': {
+        'sides': {'Left': ('LEFT_HIP', 'LEFT_KNEE', 'LEFT_ANKLE')},
+        'aggregate': 'mean',
+        'arm': {'above': 160, 'stage': 'up'},
+        'rep': {'below': 100, 'stage': 'down'},
+    }
+}
 
 class SquatDetector:
     def __init__(self):
-        self.counter = 0
-        self.stage = None
-        self.mp_pose = mp.solutions.pose
+        self.engine = ExerciseEngine(definitions=DEFINITION)
+        self.landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+
+    @property
+    def counter(self):
+        return self.engine.counter('Squats')
+
+    @property
+    def stage(self):
+        return self.engine.stage('Squats')
         
     def calculate_angle(self, a, b, c):
-        a = np.array(a)
-        b = np.array(b)
-        c = np.array(c)
-        
-        radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
-        angle = np.abs(radians*180.0/np.pi)
-        
-        if angle > 180.0:
-            angle = 360-angle
-            
-        return angle
+        return calculate_angle(a, b, c)
         
     def detect_squat(self, landmarks):
         if landmarks is None:
             return False, 0
             
         try:
-            # Get coordinates for squat detection
-            hip = [landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                   landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y]
-            knee = [landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].x,
-                    landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].y]
-            ankle = [landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].x,
-                     landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].y]
-            
-            # Calculate knee angle
-            angle = self.calculate_angle(hip, knee, ankle)
-            
-            # Squat logic
-            if angle > 160:
-                self.stage = "up"
-            elif angle < 100 and self.stage == "up":
-                self.stage = "down"
-                self.counter += 1
-                
-            return True, angle
+            self.engine.update(landmarks_to_array(landmarks, self.landmarks))
+            return True, float(self.engine.angles[0, 0])
             
         except Exception as e:
             print(f"Error in squat detection: {e}")
             return False, 0
             
     def reset_counter(self):
-        self.counter = 0
-        self.stage = None 
\ No newline at end of file
+        self.engine.reset('Squats')
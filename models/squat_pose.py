@@ -1,43 +1,35 @@
-import numpy as np
+from models.exercise_engine import ExerciseEngine
+from utils.angles import calculate_angle, landmarks_to_array
+
+# Left hip-knee-ankle squat: enter 'squat' below 120 degrees, count on standing up past 160
+DEFINITION = {
+    'Squats': {
+        'sides': {'Left': ('LEFT_HIP', 'LEFT_KNEE', 'LEFT_ANKLE')},
+        'aggregate': 'mean',
+        'arm': {'below': 120, 'stage': 'squat'},
+        'rep': {'above': 160, 'stage': 'stand'},
+    }
+}
 
 class SquatDetector:
     def __init__(self):
-        self.squat_position = False
-        self.squat_counter = 0
-        self.prev_position = 'stand'
+        self.engine = ExerciseEngine(definitions=DEFINITION)
+
+    @property
+    def squat_counter(self):
+        return self.engine.counter('Squats')
+
+    @property
+    def prev_position(self):
+        return self.engine.stage('Squats') or 'stand'
         
     def calculate_angle(self, a, b, c):
         """Calculate angle between three points"""
-        a = np.array(a)
-        b = np.array(b)
-        c = np.array(c)
-        
-        radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - \
-                 np.arctan2(a[1]-b[1], a[0]-b[0])
-        angle = np.abs(radians*180.0/np.pi)
-        
-        if angle > 180.0:
-            angle = 360-angle
-            
-        return angle
+        return calculate_angle(a, b, c)
 
     def detect_squat(self, landmarks):
         if landmarks is None:
             return False, self.squat_counter
         
-        # Get hip, knee and ankle points
-        hip = [landmarks.landmark[23].x, landmarks.landmark[23].y]
-        knee = [landmarks.landmark[25].x, landmarks.landmark[25].y]
-        ankle = [landmarks.landmark[27].x, landmarks.landmark[27].y]
-        
-        # Calculate angle
-        angle = self.calculate_angle(hip, knee, ankle)
-        
-        # Detect squat position
-        if angle < 120 and self.prev_position == 'stand':
-            self.prev_position = 'squat'
-        elif angle > 160 and self.prev_position == 'squat':
-            self.prev_position = 'stand'
-            self.squat_counter += 1
-            
-        return self.prev_position == 'squat', self.squat_counter 
\ No newline at end of file
+        self.engine.update(landmarks_to_array(landmarks))
+        return self.prev_position == 'squat', self.squat_counter
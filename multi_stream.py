@@ -0,0 +1,60 @@
+import argparse
+import json
+import sys
+import time
+
+from config.settings import EXERCISE_CONFIG, STREAMS_CONFIG
+from utils.streams import MultiStreamRunner
+
+def format_reports(reports, exercise):
+    lines = [f"{'station':>7} {'source':<24} {'fps':>6} {'p50 ms':>7} {'p95 ms':>7} {'reps':>5}  status"]
+    for r in reports:
+        reps = r.get('counters', {}).get(exercise, {}).get('counter', '-')
+        status = r['error'] or ('running' if r['running'] else 'done')
+        lines.append(f"{r['station']:>7} {r['source'][:24]:<24} {r['fps']:>6} "
+                     f"{r.get('latency_ms_p50') or '-':>7} {r.get('latency_ms_p95') or '-':>7} {reps:>5}  {status}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Count reps on several cameras / video sources at once, one process per stream")
+    parser.add_argument('sources', nargs='*',
+                        help="Camera indices, video files or stream URLs (default: STREAMS_CONFIG['sources'])")
+    parser.add_argument('--exercise', choices=list(EXERCISE_CONFIG), default='Bicep Curls',
+                        help="Exercise counted and shown in the report")
+    parser.add_argument('--hand', choices=['Left', 'Right', 'Both'],
+                        help="Side(s) counted for per-side exercises (default: the exercise's default_side)")
+    parser.add_argument('--duration', type=float, help="Stop after this many seconds")
+    parser.add_argument('--no-pin', action='store_true', help="Don't pin stations to CPU cores")
+    parser.add_argument('--model-complexity', type=int, choices=[0, 1, 2])
+    parser.add_argument('--output', help="Write the final per-station reports to a .json file")
+    args = parser.parse_args(argv)
+
+    runner = MultiStreamRunner(args.sources or STREAMS_CONFIG['sources'],
+                               exercises=[args.exercise],
+                               options={args.exercise: {'selected_hand': args.hand}},
+                               pin_cores=False if args.no_pin else None,
+                               model_complexity=args.model_complexity)
+    runner.start()
+    start = time.monotonic()
+    try:
+        while runner.is_running():
+            if args.duration and time.monotonic() - start >= args.duration:
+                break
+            time.sleep(STREAMS_CONFIG['report_interval'])
+            print(format_reports(runner.poll(), args.exercise) + "\n")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.stop()
+
+    reports = runner.latest()
+    print(format_reports(reports, args.exercise))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 1 if any(r['error'] for r in reports) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import argparse
+import sys
+import time
+
+from config.settings import EXERCISE_CONFIG
+from models.exercise_engine import ExerciseCounter, ExerciseEngine
+from utils.landmark_recording import LandmarkRecording, replay
+
+EXERCISES = list(EXERCISE_CONFIG)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-count reps from landmark recordings (.plm) without a camera or pose model")
+    parser.add_argument('recordings', nargs='+', help="Files written with 'Record Landmarks'")
+    parser.add_argument('--exercise', choices=EXERCISES + ['all'], default='all')
+    parser.add_argument('--hand', choices=['Left', 'Right', 'Both'],
+                        help="Side(s) counted for per-side exercises (default: each exercise's default_side)")
+    args = parser.parse_args(argv)
+
+    exercises = EXERCISES if args.exercise == 'all' else [args.exercise]
+    options = {name: {'selected_hand': args.hand} for name in exercises}
+    # Counters only build a pose graph for process_frame; replay never runs the model
+    engine = ExerciseEngine()
+    counters = {name: ExerciseCounter(engine, name) for name in EXERCISES}
+
+    status = 0
+    for path in args.recordings:
+        try:
+            recording = LandmarkRecording(path)
+        except (OSError, ValueError) as e:
+            print(f"{path}: ERROR {e}")
+            status = 1
+            continue
+
+        for counter in counters.values():
+            counter.reset_counter()
+        start = time.perf_counter()
+        detected = replay(recording, counters, active=exercises, options=options)
+        elapsed = time.perf_counter() - start
+
+        seconds = float(recording.times[-1] - recording.times[0]) if len(recording) > 1 else 0.0
+        reps = ", ".join(f"{name}={counters[name].counter}" for name in exercises)
+        print(f"{path}: {reps} | {len(recording)} frames ({detected} with a pose, "
+              f"{seconds:.1f}s recorded) replayed in {elapsed * 1000:.1f}ms")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
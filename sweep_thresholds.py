@@ -0,0 +1,113 @@
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config.settings import EXERCISE_CONFIG
+from utils.landmark_recording import LandmarkRecording
+from utils.threshold_sweep import default_thresholds, sweep
+
+EXERCISES = list(EXERCISE_CONFIG)
+
+def find_recordings(paths):
+    recordings = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            recordings.extend(sorted(path.rglob('*.plm')))
+        else:
+            recordings.append(path)
+    return recordings
+
+def threshold_range(values):
+    start, stop, step = values
+    return np.arange(start, stop + step / 2, step)
+
+def read_labels(path):
+    """file name -> true rep count, from a CSV with 'file' and 'reps' columns"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return {Path(row['file']).name: int(row['reps']) for row in csv.DictReader(f)}
+
+def print_grid(title, grid, arm_values, fire_values, fmt):
+    print(f"\n{title} (rows: arm threshold, columns: fire threshold)")
+    print("arm\\fire " + "".join(f"{v:>8g}" for v in fire_values))
+    for i, arm in enumerate(arm_values):
+        print(f"{arm:>8g} " + "".join(f"{fmt.format(v):>8}" for v in grid[i]))
+
+def write_report(path, files, counts, arm_values, fire_values):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['file', 'arm_threshold', 'fire_threshold', 'reps'])
+        for s, file in enumerate(files):
+            for i, arm in enumerate(arm_values):
+                for j, fire in enumerate(fire_values):
+                    writer.writerow([str(file), arm, fire, int(counts[s, i, j])])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Evaluate rep counts of landmark recordings over a grid of counter thresholds")
+    parser.add_argument('recordings', nargs='+', help=".plm files or directories searched for them")
+    parser.add_argument('--exercise', choices=EXERCISES, required=True)
+    parser.add_argument('--hand', choices=['Left', 'Right', 'Both'],
+                        help="Side(s) counted for per-side exercises (default: the exercise's default_side)")
+    parser.add_argument('--arm', type=float, nargs=3, metavar=('START', 'STOP', 'STEP'),
+                        help="Arm angle thresholds (the definition's 'arm' condition)")
+    parser.add_argument('--fire', type=float, nargs=3, metavar=('START', 'STOP', 'STEP'),
+                        help="Rep angle thresholds (the definition's 'rep' condition)")
+    parser.add_argument('--labels', help="CSV with 'file' and 'reps' columns to score the grid against")
+    parser.add_argument('--output', help="Write per-session counts for every threshold pair to a CSV")
+    args = parser.parse_args(argv)
+
+    files = find_recordings(args.recordings)
+    if not files:
+        print("No recordings found")
+        return 1
+
+    default_arm, default_fire = default_thresholds(args.exercise)
+    arm_values = threshold_range(args.arm) if args.arm else np.arange(default_arm - 20, default_arm + 21, 5)
+    fire_values = threshold_range(args.fire) if args.fire else np.arange(default_fire - 20, default_fire + 21, 5)
+    # Always evaluate the live thresholds too, for comparison
+    arm_values = np.union1d(arm_values, [default_arm])
+    fire_values = np.union1d(fire_values, [default_fire])
+
+    start = time.perf_counter()
+    recordings = [LandmarkRecording(path) for path in files]
+    counts = sweep((r.landmarks for r in recordings), args.exercise, arm_values, fire_values, args.hand)
+    elapsed = time.perf_counter() - start
+    frames = sum(len(r) for r in recordings)
+    print(f"{len(files)} session(s), {frames} frames, {len(arm_values) * len(fire_values)} "
+          f"threshold pairs evaluated in {elapsed:.2f}s")
+
+    i0 = int(np.searchsorted(arm_values, default_arm))
+    j0 = int(np.searchsorted(fire_values, default_fire))
+    print(f"Current thresholds: arm {default_arm:g}, fire {default_fire:g} -> "
+          f"{int(counts[:, i0, j0].sum())} reps")
+
+    print_grid("Total reps", counts.sum(axis=0), arm_values, fire_values, "{:d}")
+    changed = (counts != counts[:, i0:i0 + 1, j0:j0 + 1]).sum(axis=0)
+    print_grid("Sessions whose count differs from the current thresholds",
+               changed, arm_values, fire_values, "{:d}")
+
+    if args.labels:
+        labels = read_labels(args.labels)
+        labelled = [s for s, path in enumerate(files) if path.name in labels]
+        if labelled:
+            truth = np.array([labels[files[s].name] for s in labelled])
+            error = np.abs(counts[labelled] - truth[:, None, None]).mean(axis=0)
+            print_grid(f"Mean absolute rep error over {len(labelled)} labelled session(s)",
+                       error, arm_values, fire_values, "{:.2f}")
+            i, j = np.unravel_index(np.argmin(error), error.shape)
+            print(f"\nBest: arm {arm_values[i]:g}, fire {fire_values[j]:g} "
+                  f"(error {error[i, j]:.2f}, current {error[i0, j0]:.2f})")
+        else:
+            print("\nNo recordings matched the labels file")
+
+    if args.output:
+        write_report(args.output, files, counts, arm_values, fire_values)
+        print(f"Report written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import numpy as np
+
+from models.exercise_engine import ExerciseCounter, ExerciseEngine
+from utils.angle_trace import AngleTrace
+from utils.angles import NUM_LANDMARKS
+
+# Defined only here, with stage names none of the built-in exercises use
+KNEE_EXTENSION = {
+    'Knee Extension': {
+        'sides': {'Right': ('RIGHT_HIP', 'RIGHT_KNEE', 'RIGHT_ANKLE')},
+        'aggregate': 'mean',
+        'arm': {'below': 90, 'stage': 'flexed'},
+        'rep': {'above': 160, 'stage': 'extended'},
+        'met': 3.0,
+        'calories_per_rep': 0.1
+    }
+}
+
+def knee_landmarks(ankle):
+    landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    landmarks[:, 3] = 1.0
+    landmarks[24, :2] = (0.5, 0.3)  # right hip
+    landmarks[26, :2] = (0.5, 0.5)  # right knee
+    landmarks[28, :2] = ankle
+    return landmarks
+
+def test_config_only_exercise_records_stage_seconds():
+    counter = ExerciseCounter(ExerciseEngine(definitions=KNEE_EXTENSION), 'Knee Extension')
+    bent, straight = knee_landmarks((0.6, 0.35)), knee_landmarks((0.5, 0.7))
+    for rep in range(3):
+        for landmarks in [bent] * 5 + [straight] * 5:
+            counter.process_landmarks(None, landmarks)
+
+    summary = counter.trace.summary()
+    assert counter.counter == 3
+    assert set(summary['stage_seconds']) == {'flexed', 'extended'}
+
+def test_unregistered_stage_gets_a_code():
+    trace = AngleTrace(['knee'], stages=['up'])
+    trace.record(0.0, [90.0])
+    trace.mark_stage(0.0, 'hold', 0)
+    trace.record(1.0, [90.0])
+    assert trace.summary()['stage_seconds'] == {'hold': 1.0}
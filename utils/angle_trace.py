@@ -0,0 +1,111 @@
+import numpy as np
+
+from config.settings import EXERCISE_CONFIG, TRACE_CONFIG
+
+# Stage an engine reports while the counted sides disagree
+ASYNC_STAGE = 'async'
+
+def config_stages(definitions=None):
+    """Every stage name the configured exercises can report, in config order"""
+    definitions = EXERCISE_CONFIG if definitions is None else definitions
+    stages = [d[key]['stage'] for d in definitions.values() for key in ('arm', 'rep')]
+    return list(dict.fromkeys(stages + [ASYNC_STAGE]))
+
+class AngleTrace:
+    """Timestamped joint angles and stage transitions in preallocated ring buffers.
+
+    record() and mark_stage() only write into NumPy arrays, so tracing a
+    session allocates nothing per frame. When a buffer is full the oldest
+    entries are overwritten. summary() condenses the trace into a small dict
+    (range of motion per joint, rep tempo, time per stage) for the history.
+
+    Stages are stored as small integer codes into `stages` (code 0 is no
+    stage yet); names not given up front get a code the first time they
+    are marked.
+    """
+
+    def __init__(self, joint_names, stages=None, capacity=None, transition_capacity=None):
+        self.joint_names = list(joint_names)
+        self.stages = [None] + [stage for stage in (config_stages() if stages is None else stages)
+                                if stage is not None]
+        self.stage_codes = {stage: code for code, stage in enumerate(self.stages)}
+        capacity = capacity or TRACE_CONFIG['capacity']
+        transition_capacity = transition_capacity or TRACE_CONFIG['transition_capacity']
+
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.angles = np.zeros((capacity, len(self.joint_names)), dtype=np.float32)
+        self.transition_times = np.zeros(transition_capacity, dtype=np.float64)
+        self.transition_stages = np.zeros(transition_capacity, dtype=np.int8)
+        self.transition_reps = np.zeros(transition_capacity, dtype=np.int32)
+        self.count = 0
+        self.transition_count = 0
+
+    def reset(self):
+        self.count = 0
+        self.transition_count = 0
+
+    def record(self, t, angles):
+        i = self.count % len(self.times)
+        self.times[i] = t
+        self.angles[i] = angles
+        self.count += 1
+
+    def mark_stage(self, t, stage, reps):
+        i = self.transition_count % len(self.transition_times)
+        self.transition_times[i] = t
+        code = self.stage_codes.get(stage)
+        if code is None:
+            code = self.stage_codes[stage] = len(self.stages)
+            self.stages.append(stage)
+        self.transition_stages[i] = code
+        self.transition_reps[i] = reps
+        self.transition_count += 1
+
+    @staticmethod
+    def _ordered(count, *arrays):
+        # Chronological views/copies of ring buffers holding `count` writes
+        size = len(arrays[0])
+        if count <= size:
+            return [a[:count] for a in arrays]
+        start = count % size
+        return [np.concatenate((a[start:], a[:start])) for a in arrays]
+
+    def summary(self):
+        times, angles = self._ordered(self.count, self.times, self.angles)
+        if len(times) == 0:
+            return {'frames': 0}
+
+        summary = {
+            'frames': int(self.count),
+            'seconds': round(float(times[-1] - times[0]), 2),
+            'joints': {},
+        }
+        lo, hi, mean = angles.min(axis=0), angles.max(axis=0), angles.mean(axis=0)
+        for j, name in enumerate(self.joint_names):
+            summary['joints'][name] = {
+                'min': round(float(lo[j]), 1),
+                'max': round(float(hi[j]), 1),
+                'range': round(float(hi[j] - lo[j]), 1),
+                'mean': round(float(mean[j]), 1),
+            }
+
+        t_times, t_stages, t_reps = self._ordered(self.transition_count, self.transition_times,
+                                                  self.transition_stages, self.transition_reps)
+        if len(t_times):
+            # Tempo: time between transitions that completed a rep
+            rep_times = t_times[1:][np.diff(t_reps) > 0]
+            if len(rep_times) > 1:
+                rep_seconds = np.diff(rep_times)
+                summary['rep_seconds'] = {
+                    'mean': round(float(rep_seconds.mean()), 2),
+                    'min': round(float(rep_seconds.min()), 2),
+                    'max': round(float(rep_seconds.max()), 2),
+                }
+
+            # Time spent in each stage, up to the last recorded frame
+            durations = np.diff(np.append(t_times, times[-1]))
+            summary['stage_seconds'] = {
+                self.stages[code]: round(float(durations[t_stages == code].sum()), 2)
+                for code in np.unique(t_stages) if self.stages[code] is not None
+            }
+        return summary
@@ -0,0 +1,46 @@
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+def landmarks_to_array(landmarks, out=None):
+    """Copy pose landmarks into a (33, 4) float32 array of x, y, z, visibility.
+
+    Accepts a NormalizedLandmarkList, its `.landmark` sequence or an array that
+    is already in this layout. Pass `out` to reuse a preallocated buffer.
+    """
+    if isinstance(landmarks, np.ndarray):
+        if out is None:
+            return landmarks
+        out[:] = landmarks
+        return out
+
+    if hasattr(landmarks, 'landmark'):
+        landmarks = landmarks.landmark
+
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    out[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks]
+    return out
+
+def joint_angles(points, triplets):
+    """Angles in degrees at the middle joint of every (a, b, c) index triplet.
+
+    `points` is a (..., 33, >=2) landmark array and `triplets` a (K, 3) integer
+    array, so a single call covers every joint of a frame (or of a whole
+    recorded sequence) with one arctan2.
+    """
+    triplets = np.asarray(triplets)
+    ends = points[..., triplets[:, [2, 0]], :2]
+    mids = points[..., triplets[:, 1:2], :2]
+    vectors = ends - mids
+    headings = np.arctan2(vectors[..., 1], vectors[..., 0])
+
+    angles = np.abs(np.degrees(headings[..., 0] - headings[..., 1]))
+    return np.where(angles > 180.0, 360.0 - angles, angles)
+
+_SINGLE_TRIPLET = np.array([[0, 1, 2]])
+
+def calculate_angle(a, b, c):
+    """Calculate angle between three points"""
+    points = np.array([a[:2], b[:2], c[:2]], dtype=np.float64)
+    return float(joint_angles(points, _SINGLE_TRIPLET)[0])
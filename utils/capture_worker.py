@@ -0,0 +1,158 @@
+import threading
+import time
+import cv2
+
+FRAME_BUFFERS = 3
+
+class CaptureWorker:
+    """Reads the camera and runs the pose engine on a background thread.
+
+    Only the newest processed frame is kept: the UI picks it up with latest()
+    whenever it is ready, and frames it never got to are simply overwritten.
+    Frames are read, flipped and drawn on in place, in a pool of three reused
+    buffers: the published one, the one the UI last took, and one to fill.
+    """
+
+    def __init__(self, camera, engine, flip=True, timer=None):
+        self.camera = camera
+        self.engine = engine
+        self.flip = flip
+        # Optional StageTimer for the capture stage (read + flip)
+        self.timer = timer
+        self.error = None
+        # _lock guards the published result/options; _engine_lock guards the
+        # counters so the UI never waits on inference just to read a frame
+        self._lock = threading.Lock()
+        self._engine_lock = threading.Lock()
+        self._options = {}
+        self._latest = None
+        self._seq = 0
+        self._buffers = [None] * FRAME_BUFFERS
+        self._published = None
+        self._held = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        # Set by close(); whichever of close() and the exiting thread comes
+        # last releases the camera, so it is never released mid-read
+        self._closing = False
+        self._close_engine = False
+        self._released = False
+
+    def set_options(self, **options):
+        """Replace the keyword arguments passed to engine.process_frame"""
+        with self._lock:
+            self._options = options
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="capture-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Ask the thread to stop; True once it has exited, False if it is still finishing a frame"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        if thread is not None and thread.is_alive():
+            # Keep the reference so is_alive() stays truthful until it exits
+            return False
+        self._thread = None
+        return True
+
+    def close(self, timeout=1.0, close_engine=False):
+        """Stop, then release the camera (and close the engine with close_engine).
+
+        If the thread is still inside a frame after timeout, it does this
+        itself as it exits, so nothing is released while it uses it.
+        """
+        with self._lock:
+            self._closing = True
+            self._close_engine = close_engine
+        if self.stop(timeout):
+            self._release()
+
+    def _release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        try:
+            self.camera.release()
+            if self._close_engine:
+                self.engine.close()
+        except Exception as e:
+            print(f"Error releasing camera: {e}")
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self, after_seq=0):
+        """Return (seq, frame, state) if a result newer than after_seq exists, else None"""
+        with self._lock:
+            if self._latest is None or self._latest[0] <= after_seq:
+                return None
+            # The caller may keep using this frame until its next latest()
+            self._held = self._published
+            return self._latest
+
+    def reset_counter(self, name):
+        # Counters are mutated on the worker thread, so reset under the same lock
+        with self._engine_lock:
+            self.engine.reset_counter(name)
+
+    def apply(self, fn):
+        """Call fn(engine) between frames, e.g. to change settings of the running engine"""
+        with self._engine_lock:
+            return fn(self.engine)
+
+    def start_recording(self, path):
+        with self._engine_lock:
+            return self.engine.start_recording(path)
+
+    def stop_recording(self):
+        with self._engine_lock:
+            self.engine.stop_recording()
+
+    def _next_buffer(self):
+        # Neither published nor held by the UI, so safe to overwrite
+        with self._lock:
+            busy = (self._published, self._held)
+        return next(i for i in range(FRAME_BUFFERS) if i not in busy)
+
+    def _run(self):
+        try:
+            self._loop()
+        finally:
+            with self._lock:
+                closing = self._closing
+            if closing:
+                self._release()
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            i = self._next_buffer()
+            start = time.perf_counter()
+            ret, frame = self.camera.read(self._buffers[i])
+            if not ret:
+                self.error = "Failed to read from camera!"
+                break
+            self._buffers[i] = frame
+
+            if self.flip:
+                cv2.flip(frame, 1, dst=frame)
+            if self.timer is not None:
+                self.timer.since('capture', start)
+
+            with self._lock:
+                options = self._options
+
+            with self._engine_lock:
+                processed = self.engine.process_frame(frame, in_place=True, **options)
+                state = self.engine.snapshot()
+
+            with self._lock:
+                self._seq += 1
+                self._latest = (self._seq, processed, state)
+                self._published = i
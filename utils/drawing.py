@@ -0,0 +1,36 @@
+import cv2
+import mediapipe as mp
+import numpy as np
+
+# (start, end) landmark index pairs, same skeleton MediaPipe draws
+POSE_CONNECTIONS = np.array(sorted(mp.solutions.pose.POSE_CONNECTIONS), dtype=np.int32)
+
+def draw_skeleton(image, landmarks, connections=POSE_CONNECTIONS,
+                  landmark_color=(245,117,66), connection_color=(245,66,230),
+                  thickness=2, radius=2, visibility_threshold=0.5, joints=None):
+    """Draw a (33, 4) landmark array onto image, like mp_drawing.draw_landmarks.
+
+    Pass the result of skeleton_subset() as `connections` together with its
+    joints to draw only part of the body.
+    """
+    h, w = image.shape[:2]
+    points = np.rint(landmarks[:, :2] * (w, h)).astype(np.int32)
+    visible = landmarks[:, 3] >= visibility_threshold
+    if joints is not None:
+        selected = np.zeros(len(landmarks), dtype=bool)
+        selected[joints] = True
+        visible &= selected
+
+    # All bones in a single polylines call
+    shown = connections[visible[connections[:, 0]] & visible[connections[:, 1]]]
+    if len(shown):
+        cv2.polylines(image, list(points[shown]), False, connection_color, thickness)
+
+    for x, y in points[visible].tolist():
+        cv2.circle(image, (x, y), radius, landmark_color, thickness)
+    return image
+
+def skeleton_subset(joints, connections=POSE_CONNECTIONS):
+    """Connections whose both ends are in joints"""
+    keep = np.isin(connections, joints).all(axis=1)
+    return connections[keep]
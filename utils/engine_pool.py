@@ -0,0 +1,294 @@
+import threading
+import time
+
+from config.settings import ENGINE_POOL_CONFIG, EXERCISE_CONFIG, INFERENCE_CONFIG, LANDMARK_FILTER_CONFIG
+from utils.landmark_filter import LandmarkFilter
+
+def build_engine(**kwargs):
+    """PoseEngine with every EXERCISE_CONFIG exercise, as the app pages use it"""
+    # Imported here so importing this module doesn't load MediaPipe
+    from models.pose_engine import PoseEngine
+
+    engine = PoseEngine(**kwargs)
+    for name in EXERCISE_CONFIG:
+        engine.add_exercise(name)
+    return engine
+
+class EngineLease:
+    """One session's hold on a pooled engine, plus the resources that go with it.
+
+    Register cleanups (stop a capture thread, release a VideoCapture) with
+    on_release(); they run exactly once when the lease is released, whether
+    by the session or by the pool after lease_timeout seconds without a
+    touch(), e.g. because the browser tab went away. Threads that may still
+    be inside the engine after the cleanups go to hold_while(), so the pool
+    doesn't reset the graph under them.
+    """
+
+    def __init__(self, pool, engine, warm):
+        self.pool = pool
+        self.engine = engine
+        self.warm = warm
+        self.released = False
+        self.last_seen = time.monotonic()
+        self._cleanups = []
+        self._busy = []
+
+    def on_release(self, cleanup):
+        self._cleanups.append(cleanup)
+        return cleanup
+
+    def hold_while(self, is_busy):
+        """Keep the engine out of the pool after release until is_busy() is False"""
+        self._busy.append(is_busy)
+
+    def busy(self):
+        return any(is_busy() for is_busy in self._busy)
+
+    def touch(self):
+        """Mark the session alive; False once the lease has been released"""
+        # Under the pool's lock, so the pool can't expire it halfway through
+        with self.pool._changed:
+            self.last_seen = time.monotonic()
+            return not self.released
+
+    def release(self):
+        self.pool.release(self)
+
+class PoseEnginePool:
+    """Process-wide pool of pose engines that sessions lease while a camera is active.
+
+    At most max_engines exist at once (leased, idle or being prepared). A
+    background thread keeps `warm` idle engines built and warmed up (MediaPipe
+    import and graph start-up happen there, not on Start Camera), resets and
+    re-warms returned engines before they are leased again, closes idle
+    engines beyond `warm` after idle_timeout seconds, and releases leases
+    that have not been touched for lease_timeout seconds.
+    """
+
+    def __init__(self, max_engines=None, warm=None, idle_timeout=None, lease_timeout=None,
+                 interval=None, factory=None):
+        self.max_engines = max_engines or ENGINE_POOL_CONFIG['max_engines']
+        self.warm = ENGINE_POOL_CONFIG['warm'] if warm is None else warm
+        self.idle_timeout = idle_timeout or ENGINE_POOL_CONFIG['idle_timeout']
+        self.lease_timeout = lease_timeout or ENGINE_POOL_CONFIG['lease_timeout']
+        self.interval = interval or ENGINE_POOL_CONFIG['interval']
+        self.factory = factory or build_engine
+
+        # Idle entries are (engine, idle since); released leases wait in _dirty
+        # until their engine is no longer in use, then get cleaned
+        self._idle = []
+        self._dirty = []
+        self._leases = []
+        self._preparing = 0
+        self._changed = threading.Condition()
+        self._wake = threading.Event()
+        self._thread = None
+        self.timings = {}
+        self.stats = {'built': 0, 'evicted': 0, 'expired': 0}
+
+    def start(self):
+        """Start the pool's maintenance thread (idempotent); returns immediately"""
+        with self._changed:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="engine-pool", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return self
+
+    def size(self):
+        with self._changed:
+            return self._size()
+
+    def _size(self):
+        leased = sum(lease.engine is not None for lease in self._leases)
+        return len(self._idle) + len(self._dirty) + leased + self._preparing
+
+    def _coming(self):
+        # An engine is being built or cleaned, or is about to be
+        return self._preparing or any(not lease.busy() for lease in self._dirty)
+
+    def _build(self):
+        start = time.perf_counter()
+        engine = self.factory()
+        built = time.perf_counter()
+        engine.warm_up()
+        # The first engine's build includes importing MediaPipe
+        self.timings.setdefault('first_build_s', round(built - start, 3))
+        self.timings.setdefault('first_warm_up_s', round(time.perf_counter() - built, 3))
+        self.timings['last_build_s'] = round(time.perf_counter() - start, 3)
+        self.stats['built'] += 1
+        return engine
+
+    def _clean(self, engine):
+        # Back to a fresh engine's state so nothing leaks into the next session
+        engine.stop_recording()
+        engine.timer = None
+        engine.exercise_joints_only = False
+        engine.keyframe_interval = INFERENCE_CONFIG['keyframe_interval']
+        engine.filter = LandmarkFilter() if LANDMARK_FILTER_CONFIG['enabled'] else None
+        for counter in engine.counters.values():
+            counter.reset_counter()
+        # reset() restarts the graph, so warm it up again
+        engine.reset()
+        engine.warm_up()
+
+    def lease(self, timeout=None):
+        """Lease an engine; None only if the pool is full and none freed up within timeout seconds.
+
+        An engine that is being built or re-warmed is waited for, however long
+        that takes, rather than reported as busy.
+        """
+        self.start()
+        timeout = ENGINE_POOL_CONFIG['lease_wait'] if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                if self._idle:
+                    engine, _ = self._idle.pop()
+                    lease = EngineLease(self, engine, warm=True)
+                    self._leases.append(lease)
+                    return lease
+                if self._coming():
+                    # Hand that one over when it's ready; wait() re-checks on every change
+                    self._changed.wait(self.interval)
+                    continue
+                if self._size() < self.max_engines:
+                    # Nothing on its way; build one for this caller
+                    self._preparing += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+
+        try:
+            engine = self._build()
+        except Exception as e:
+            print(f"Error building pose engine: {e}")
+            with self._changed:
+                self._preparing -= 1
+                self._changed.notify_all()
+            return None
+        with self._changed:
+            self._preparing -= 1
+            lease = EngineLease(self, engine, warm=False)
+            self._leases.append(lease)
+            return lease
+
+    def session(self):
+        """A lease without an engine, for sessions whose graphs live outside the pool
+        (group mode): the same heartbeat, expiry and cleanups, nothing to return"""
+        self.start()
+        lease = EngineLease(self, None, warm=False)
+        with self._changed:
+            self._leases.append(lease)
+        return lease
+
+    def release(self, lease, stale=False):
+        """Run the lease's cleanups and hand its engine back to be reset and re-warmed.
+
+        With stale, only if the lease still hasn't been touched for lease_timeout.
+        Returns whether this call released it.
+        """
+        with self._changed:
+            if lease.released:
+                return False
+            if stale and time.monotonic() - lease.last_seen <= self.lease_timeout:
+                return False
+            lease.released = True
+            self._leases.remove(lease)
+
+        for cleanup in lease._cleanups:
+            try:
+                cleanup()
+            except Exception as e:
+                print(f"Error releasing session resources: {e}")
+
+        if lease.engine is not None:
+            with self._changed:
+                self._dirty.append(lease)
+            self._wake.set()
+        return True
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self._maintain()
+            except Exception as e:
+                print(f"Error maintaining engine pool: {e}")
+
+    def _maintain(self):
+        now = time.monotonic()
+        with self._changed:
+            expired = [lease for lease in self._leases if now - lease.last_seen > self.lease_timeout]
+        for lease in expired:
+            # Re-checked under the lock: a touch() since the scan keeps it
+            if self.release(lease, stale=True):
+                self.stats['expired'] += 1
+
+        while True:
+            with self._changed:
+                returned = next((lease for lease in self._dirty if not lease.busy()), None)
+                if returned is None:
+                    break
+                self._dirty.remove(returned)
+                engine = returned.engine
+                self._preparing += 1
+            try:
+                self._clean(engine)
+            except Exception as e:
+                print(f"Error resetting pose engine: {e}")
+                engine.close()
+                engine = None
+            with self._changed:
+                self._preparing -= 1
+                if engine is not None:
+                    self._idle.append((engine, time.monotonic()))
+                self._changed.notify_all()
+
+        # Close engines that sat idle too long, beyond the warm ones
+        with self._changed:
+            evict = []
+            while len(self._idle) > self.warm and now - self._idle[0][1] > self.idle_timeout:
+                evict.append(self._idle.pop(0)[0])
+        for engine in evict:
+            self.stats['evicted'] += 1
+            engine.close()
+
+        while True:
+            with self._changed:
+                if len(self._idle) >= self.warm or self._size() >= self.max_engines:
+                    break
+                self._preparing += 1
+            try:
+                engine = self._build()
+            except Exception as e:
+                print(f"Error warming pose engine: {e}")
+                engine = None
+            with self._changed:
+                self._preparing -= 1
+                if engine is not None:
+                    self._idle.append((engine, time.monotonic()))
+                self._changed.notify_all()
+            if engine is None:
+                break
+
+    def report(self):
+        with self._changed:
+            leased = sum(lease.engine is not None for lease in self._leases)
+            return dict(self.stats, leased=leased, sessions=len(self._leases) - leased,
+                        idle=len(self._idle), size=self._size(), max_engines=self.max_engines)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def engine_pool():
+    """The process-wide PoseEnginePool (every page and session shares it), started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PoseEnginePool()
+        return _pool.start()
@@ -0,0 +1,43 @@
+import time
+import cv2
+
+from config.settings import VIDEO_CONFIG
+
+class JpegFrameEncoder:
+    """Encodes BGR frames to JPEG bytes for st.image, at a fixed quality and size.
+
+    OpenCV encodes BGR directly, so there is no channel swap, and the resize
+    target buffer is reused across frames. Frames arriving faster than max_fps
+    are skipped (encode() returns None) rather than sent to the browser.
+    """
+
+    def __init__(self, quality=None, width=None, max_fps=None):
+        quality = VIDEO_CONFIG['jpeg_quality'] if quality is None else quality
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self.width = VIDEO_CONFIG['display_width'] if width is None else width
+        max_fps = VIDEO_CONFIG['display_fps'] if max_fps is None else max_fps
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self.last_sent = 0.0
+        self._resized = None
+
+    def _resize(self, frame):
+        h, w = frame.shape[:2]
+        if not self.width or w <= self.width:
+            return frame
+
+        size = (self.width, int(h * self.width / w))
+        if self._resized is None or self._resized.shape[:2] != (size[1], size[0]):
+            self._resized = None
+        self._resized = cv2.resize(frame, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        return self._resized
+
+    def encode(self, frame):
+        now = time.monotonic()
+        if now - self.last_sent < self.interval:
+            return None
+
+        ok, buffer = cv2.imencode('.jpg', self._resize(frame), self.params)
+        if not ok:
+            return None
+        self.last_sent = now
+        return buffer.tobytes()
@@ -16,6 +16,12 @@ def resize_frame(frame, width=None, height=None):
     
     return cv2.resize(frame, dimension, interpolation=cv2.INTER_AREA)
 
+def reuse_buffer(buffer, shape, dtype=np.uint8):
+    """Return buffer if it already has this shape, otherwise a new empty array"""
+    if buffer is None or buffer.shape != tuple(shape):
+        return np.empty(shape, dtype=dtype)
+    return buffer
+
 def draw_text(frame, text, position, scale=1, color=(0, 255, 0), thickness=2):
     """Draw text on frame with background"""
     cv2.putText(frame, text, position, cv2.FONT_HERSHEY_SIMPLEX,
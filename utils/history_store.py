@@ -0,0 +1,256 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from config.settings import HISTORY_CONFIG
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+ROLLUP_COLUMNS = """
+    workouts INTEGER NOT NULL DEFAULT 0,
+    reps INTEGER NOT NULL DEFAULT 0,
+    calories REAL NOT NULL DEFAULT 0,
+    duration_mins REAL NOT NULL DEFAULT 0"""
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS workouts (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    time TEXT NOT NULL,
+    exercise_type TEXT NOT NULL,
+    reps INTEGER NOT NULL,
+    calories REAL NOT NULL,
+    duration_mins REAL NOT NULL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_time ON workouts (user_id, time);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_exercise_time ON workouts (user_id, exercise_type, time);
+
+-- Rollups are maintained on every append so the History page never scans workouts
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    exercise_type TEXT NOT NULL,{ROLLUP_COLUMNS},
+    PRIMARY KEY (user_id, day, exercise_type)
+);
+CREATE TABLE IF NOT EXISTS weekly_rollups (
+    user_id TEXT NOT NULL,
+    week TEXT NOT NULL,
+    exercise_type TEXT NOT NULL,{ROLLUP_COLUMNS},
+    PRIMARY KEY (user_id, week, exercise_type)
+);
+CREATE TABLE IF NOT EXISTS exercise_totals (
+    user_id TEXT NOT NULL,
+    exercise_type TEXT NOT NULL,{ROLLUP_COLUMNS},
+    PRIMARY KEY (user_id, exercise_type)
+);
+CREATE TABLE IF NOT EXISTS history_versions (
+    user_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+COLUMNS = ('time', 'exercise_type', 'reps', 'calories', 'duration_mins')
+
+def week_start(day):
+    """Monday of the week containing day ('YYYY-MM-DD')"""
+    date = datetime.strptime(day, '%Y-%m-%d').date()
+    return (date - timedelta(days=date.weekday())).isoformat()
+
+class WorkoutHistoryStore:
+    """Append-only workout log in SQLite, indexed by user, time and exercise.
+
+    `time` is stored as 'YYYY-MM-DD HH:MM:SS', so string comparison is time
+    order and range queries use the (user_id, time) index directly. Daily,
+    weekly and all-time per-exercise rollups are updated in the same
+    transaction as each append, and every change bumps the user's version
+    so callers can cache anything derived from the history.
+    """
+
+    def __init__(self, path=None):
+        path = Path(path or HISTORY_CONFIG['db_path'])
+        if not path.is_absolute():
+            path = ROOT_DIR / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+
+        # Streamlit reruns scripts on different threads, so one shared
+        # connection is used behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+            self._backfill_rollups()
+
+    def _migrate(self):
+        # Columns added after the first release of the workouts table
+        existing = {row['name'] for row in self._conn.execute("PRAGMA table_info(workouts)")}
+        if 'details' not in existing:
+            with self._conn:
+                self._conn.execute("ALTER TABLE workouts ADD COLUMN details TEXT")
+
+    def _backfill_rollups(self):
+        # Databases written before rollups existed: build them once from workouts
+        has_rollups = self._conn.execute("SELECT 1 FROM exercise_totals LIMIT 1").fetchone()
+        has_workouts = self._conn.execute("SELECT 1 FROM workouts LIMIT 1").fetchone()
+        if has_rollups or not has_workouts:
+            return
+
+        with self._conn:
+            rows = self._conn.execute(
+                f"SELECT user_id, {', '.join(COLUMNS)} FROM workouts ORDER BY id"
+            ).fetchall()
+            for row in rows:
+                self._add_to_rollups(row['user_id'], dict(row))
+
+    def _bump_version(self, user_id):
+        self._conn.execute(
+            "INSERT INTO history_versions (user_id, version) VALUES (?, 1) "
+            "ON CONFLICT (user_id) DO UPDATE SET version = version + 1",
+            (user_id,)
+        )
+
+    def _add_to_rollups(self, user_id, workout):
+        day = workout['time'][:10]
+        values = (1, workout['reps'], workout['calories'], workout['duration_mins'])
+        increment = ("workouts = workouts + excluded.workouts, reps = reps + excluded.reps, "
+                     "calories = calories + excluded.calories, "
+                     "duration_mins = duration_mins + excluded.duration_mins")
+
+        self._conn.execute(
+            "INSERT INTO daily_rollups (user_id, day, exercise_type, workouts, reps, calories, duration_mins) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (user_id, day, exercise_type) DO UPDATE SET {increment}",
+            (user_id, day, workout['exercise_type']) + values
+        )
+        self._conn.execute(
+            "INSERT INTO weekly_rollups (user_id, week, exercise_type, workouts, reps, calories, duration_mins) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (user_id, week, exercise_type) DO UPDATE SET {increment}",
+            (user_id, week_start(day), workout['exercise_type']) + values
+        )
+        self._conn.execute(
+            "INSERT INTO exercise_totals (user_id, exercise_type, workouts, reps, calories, duration_mins) "
+            f"VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (user_id, exercise_type) DO UPDATE SET {increment}",
+            (user_id, workout['exercise_type']) + values
+        )
+        self._bump_version(user_id)
+
+    def append(self, user_id, workout):
+        """Store one workout dict (time, exercise_type, reps, calories, duration_mins).
+
+        An optional 'details' entry (e.g. the session's angle trace summary) is
+        stored as JSON and read back with details().
+        """
+        details = workout.get('details')
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO workouts (user_id, time, exercise_type, reps, calories, duration_mins, details) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user_id,) + tuple(workout[c] for c in COLUMNS) +
+                (json.dumps(details) if details is not None else None,)
+            )
+            self._add_to_rollups(user_id, workout)
+            return cursor.lastrowid
+
+    def version(self, user_id):
+        """Changes whenever the user's history does; use it as a cache key"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM history_versions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def query(self, user_id, start=None, end=None, exercise_type=None, limit=None, newest_first=False):
+        """Workouts in [start, end) for one user, optionally for one exercise"""
+        sql = f"SELECT {', '.join(COLUMNS)} FROM workouts WHERE user_id = ?"
+        params = [user_id]
+        if exercise_type is not None:
+            sql += " AND exercise_type = ?"
+            params.append(exercise_type)
+        if start is not None:
+            sql += " AND time >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND time < ?"
+            params.append(end)
+        sql += " ORDER BY time DESC" if newest_first else " ORDER BY time"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def details(self, user_id, start=None, end=None, exercise_type=None):
+        """(time, details dict) for workouts in [start, end) that have details"""
+        sql = "SELECT time, details FROM workouts WHERE user_id = ? AND details IS NOT NULL"
+        params = [user_id]
+        if exercise_type is not None:
+            sql += " AND exercise_type = ?"
+            params.append(exercise_type)
+        if start is not None:
+            sql += " AND time >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND time < ?"
+            params.append(end)
+        sql += " ORDER BY time"
+
+        with self._lock:
+            return [(row['time'], json.loads(row['details'])) for row in self._conn.execute(sql, params)]
+
+    def recent(self, user_id, limit):
+        """Latest `limit` workouts, oldest first"""
+        return self.query(user_id, limit=limit, newest_first=True)[::-1]
+
+    def totals(self, user_id):
+        """All-time totals, summed over one rollup row per exercise type"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(workouts), 0) AS workouts, COALESCE(SUM(reps), 0) AS reps, "
+                "COALESCE(SUM(calories), 0) AS calories, COALESCE(SUM(duration_mins), 0) AS duration_mins "
+                "FROM exercise_totals WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return dict(row)
+
+    def exercise_counts(self, user_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT exercise_type, workouts FROM exercise_totals WHERE user_id = ?",
+                (user_id,)
+            ).fetchall()
+        return {exercise: count for exercise, count in rows}
+
+    def daily(self, user_id, start_day=None):
+        """Per-day totals (all exercises combined) from start_day on"""
+        return self._rollup('daily_rollups', 'day', user_id, start_day)
+
+    def weekly(self, user_id, start_week=None):
+        """Per-week totals (weeks start on Monday) from start_week on"""
+        return self._rollup('weekly_rollups', 'week', user_id, start_week)
+
+    def _rollup(self, table, key, user_id, start):
+        sql = (f"SELECT {key}, SUM(workouts) AS workouts, SUM(reps) AS reps, "
+               f"SUM(calories) AS calories, SUM(duration_mins) AS duration_mins "
+               f"FROM {table} WHERE user_id = ?")
+        params = [user_id]
+        if start is not None:
+            sql += f" AND {key} >= ?"
+            params.append(start)
+        sql += f" GROUP BY {key} ORDER BY {key}"
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def clear(self, user_id):
+        with self._lock, self._conn:
+            for table in ('workouts', 'daily_rollups', 'weekly_rollups', 'exercise_totals'):
+                self._conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+            self._bump_version(user_id)
+
+    def close(self):
+        self._conn.close()
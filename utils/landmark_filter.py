@@ -0,0 +1,72 @@
+import numpy as np
+
+from config.settings import LANDMARK_FILTER_CONFIG
+from utils.angles import NUM_LANDMARKS
+
+class LandmarkFilter:
+    """One Euro filter over all 33 landmarks at once.
+
+    Each frame's (33, 4) array is smoothed as a whole: x, y and z get an
+    adaptive low-pass whose cutoff rises with their (smoothed) speed, so a
+    still joint is held steady while a moving one follows with little lag.
+    Visibility is passed through. Timestamps are in seconds; without one,
+    frames are assumed to arrive at `frequency` per second.
+    """
+
+    def __init__(self, min_cutoff=None, beta=None, d_cutoff=None, frequency=None):
+        self.min_cutoff = LANDMARK_FILTER_CONFIG['min_cutoff'] if min_cutoff is None else min_cutoff
+        self.beta = LANDMARK_FILTER_CONFIG['beta'] if beta is None else beta
+        self.d_cutoff = LANDMARK_FILTER_CONFIG['d_cutoff'] if d_cutoff is None else d_cutoff
+        self.frequency = frequency or LANDMARK_FILTER_CONFIG['frequency']
+
+        self._value = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self._speed = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self._delta = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self._alpha = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self.landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self._time = None
+        self._frames = 0
+
+    @staticmethod
+    def _smoothing(cutoff, dt):
+        # Exponential smoothing factor of a first order low-pass at cutoff Hz
+        return 1.0 / (1.0 + 1.0 / (2 * np.pi * cutoff * dt))
+
+    def reset(self):
+        """Start over, e.g. after the pose was lost"""
+        self._time = None
+        self._frames = 0
+
+    def __call__(self, landmarks, timestamp=None):
+        """Smoothed copy of landmarks (a buffer reused across calls)"""
+        if timestamp is None:
+            timestamp = self._frames / self.frequency
+        self._frames += 1
+
+        self.landmarks[:, 3] = landmarks[:, 3]
+        if self._time is None:
+            self._value[:] = landmarks[:, :3]
+            self._speed[:] = 0.0
+            self._time = timestamp
+            self.landmarks[:, :3] = self._value
+            return self.landmarks
+
+        dt = timestamp - self._time
+        if dt <= 0:
+            dt = 1.0 / self.frequency
+        self._time = timestamp
+
+        # Smoothed speed of every coordinate, then a per-coordinate cutoff
+        np.subtract(landmarks[:, :3], self._value, out=self._delta)
+        self._speed += self._smoothing(self.d_cutoff, dt) * (self._delta / dt - self._speed)
+        np.abs(self._speed, out=self._alpha)
+        self._alpha *= self.beta
+        self._alpha += self.min_cutoff
+        self._alpha *= 2 * np.pi * dt
+        # alpha = 1 / (1 + 1 / (2 pi cutoff dt)) = x / (x + 1) with x = 2 pi cutoff dt
+        self._alpha /= self._alpha + 1.0
+
+        self._delta *= self._alpha
+        self._value += self._delta
+        self.landmarks[:, :3] = self._value
+        return self.landmarks
@@ -0,0 +1,106 @@
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from models.exercise_engine import count_frame
+from utils.angles import NUM_LANDMARKS
+
+MAGIC = b'PLMKREC1'
+HEADER_SIZE = 64
+# Fixed-stride record: frame timestamp (seconds) + (33, 4) x, y, z, visibility.
+# Frames without a detected pose are stored as NaN landmarks.
+RECORD_DTYPE = np.dtype([('time', '<f8'), ('landmarks', '<f4', (NUM_LANDMARKS, 4))])
+
+def _header():
+    header = MAGIC + struct.pack('<II', NUM_LANDMARKS, RECORD_DTYPE.itemsize)
+    return header.ljust(HEADER_SIZE, b'\0')
+
+class LandmarkRecorder:
+    """Appends one fixed-size record per frame to a landmark recording file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._file.write(_header())
+        # Single reusable record, written straight from its buffer
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self.frames = 0
+
+    def write(self, t, landmarks):
+        """Record one frame; landmarks is a (33, 4) array or None (no pose)"""
+        self._record['time'] = t
+        if landmarks is None:
+            self._record['landmarks'] = np.nan
+        else:
+            self._record['landmarks'][0] = landmarks
+        self._file.write(memoryview(self._record).cast('B'))
+        self.frames += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class LandmarkRecording:
+    """Read-only, memory-mapped view of a file written by LandmarkRecorder.
+
+    Nothing is read up front: times and landmarks are np.memmap views, so
+    pages are only loaded from disk as frames are accessed.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+            raise ValueError(f"{self.path} is not a landmark recording")
+        num_landmarks, record_size = struct.unpack_from('<II', header, len(MAGIC))
+        if num_landmarks != NUM_LANDMARKS or record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{self.path} has an unsupported record layout")
+
+        # A partially written last record (e.g. after a crash) is ignored
+        count = (self.path.stat().st_size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if count:
+            self.records = np.memmap(self.path, dtype=RECORD_DTYPE, mode='r',
+                                     offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self.times = self.records['time']
+        self.landmarks = self.records['landmarks']
+
+    def __len__(self):
+        return len(self.records)
+
+    def detected(self):
+        """Boolean mask of frames that have a pose"""
+        return ~np.isnan(self.landmarks[:, 0, 0])
+
+    def frames(self, start=0, stop=None):
+        """Yield (time, landmarks or None) for each frame in [start, stop)"""
+        for i in range(start, len(self) if stop is None else min(stop, len(self))):
+            landmarks = self.landmarks[i]
+            yield float(self.times[i]), None if np.isnan(landmarks[0, 0]) else landmarks
+
+def replay(recording, counters, active=None, options=None, start=0, stop=None):
+    """Feed recorded landmarks to rep counters, like PoseEngine.update without a camera or model.
+
+    `counters` maps names to counter objects (e.g. PoseEngine.counters);
+    returns the number of frames that had a pose.
+    """
+    names = list(counters) if active is None else active
+    options = {name: dict((options or {}).get(name, {}), show_angles=False) for name in names}
+
+    detected = 0
+    for _, landmarks in recording.frames(start, stop):
+        if landmarks is None:
+            continue
+        detected += 1
+        count_frame(counters, None, landmarks, names, options, show_counter=False)
+    return detected
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+PANEL_SIZE = (73, 225)  # height, width of the REPS/STAGE box
+PANEL_COLOR = (245,117,16)
+# Label sprites kept; enough for every angle 0-180 plus some group labels
+MAX_LABELS = 256
+
+class OverlayRenderer:
+    """Counter box and joint labels drawn from cached sprites.
+
+    The REPS/STAGE panel is only re-rendered when the counter or stage changes;
+    every other frame it is a single slice copy. Angle labels are rasterized
+    once per distinct text and then alpha-blended into place; the least
+    recently drawn sprites are dropped beyond max_labels, so ever-changing
+    texts (group '#id: reps' labels) don't grow the cache for a whole session.
+    """
+
+    def __init__(self, font_scale=0.5, font_thickness=2, max_labels=MAX_LABELS):
+        self.font_scale = font_scale
+        self.font_thickness = font_thickness
+        self._panel = None
+        self._panel_key = None
+        self.max_labels = max_labels
+        self._labels = OrderedDict()
+
+    def _render_panel(self, counter, stage):
+        panel = np.empty(PANEL_SIZE + (3,), dtype=np.uint8)
+        panel[:] = PANEL_COLOR
+
+        # Rep data
+        cv2.putText(panel, 'REPS', (15,12),
+                  cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,0,0), 1, cv2.LINE_AA)
+        cv2.putText(panel, str(counter),
+                  (10,60),
+                  cv2.FONT_HERSHEY_SIMPLEX, 2, (255,255,255), 2, cv2.LINE_AA)
+
+        # Stage data
+        cv2.putText(panel, 'STAGE', (65,12),
+                  cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,0,0), 1, cv2.LINE_AA)
+        cv2.putText(panel, stage or "",
+                  (60,60),
+                  cv2.FONT_HERSHEY_SIMPLEX, 2, (255,255,255), 2, cv2.LINE_AA)
+        return panel
+
+    def draw_counter(self, image, counter, stage):
+        key = (counter, stage)
+        if key != self._panel_key:
+            self._panel = self._render_panel(counter, stage)
+            self._panel_key = key
+
+        h = min(PANEL_SIZE[0], image.shape[0])
+        w = min(PANEL_SIZE[1], image.shape[1])
+        image[:h, :w] = self._panel[:h, :w]
+
+    def _render_label(self, text):
+        (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX,
+                                           self.font_scale, self.font_thickness)
+        pad = self.font_thickness
+        alpha = np.zeros((h + baseline + 2 * pad, w + 2 * pad), dtype=np.uint8)
+        cv2.putText(alpha, text, (pad, h + pad), cv2.FONT_HERSHEY_SIMPLEX,
+                    self.font_scale, 255, self.font_thickness, cv2.LINE_AA)
+        # Stored as (alpha, offset from the text origin to the sprite corner)
+        return alpha[..., None].astype(np.uint16), (-pad, -(h + pad))
+
+    def draw_label(self, image, text, origin):
+        """White text with its baseline-left corner at origin, like cv2.putText"""
+        sprite = self._labels.get(text)
+        if sprite is None:
+            sprite = self._labels[text] = self._render_label(text)
+            if len(self._labels) > self.max_labels:
+                self._labels.popitem(last=False)
+        else:
+            self._labels.move_to_end(text)
+        alpha, (dx, dy) = sprite
+
+        x0, y0 = int(origin[0]) + dx, int(origin[1]) + dy
+        x1, y1 = x0 + alpha.shape[1], y0 + alpha.shape[0]
+        # Clip the sprite to the image
+        cx0, cy0 = max(x0, 0), max(y0, 0)
+        cx1, cy1 = min(x1, image.shape[1]), min(y1, image.shape[0])
+        if cx0 >= cx1 or cy0 >= cy1:
+            return
+
+        a = alpha[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0]
+        roi = image[cy0:cy1, cx0:cx1]
+        # Blend towards white: roi + (255 - roi) * a / 255
+        roi += (((255 - roi.astype(np.uint16)) * a + 127) // 255).astype(np.uint8)
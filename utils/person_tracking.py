@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+
+from utils.helpers import resize_frame
+
+def box_iou(a, b):
+    """(N, M) intersection over union of (N, 4) and (M, 4) x0, y0, x1, y1 boxes"""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.where(union > 0, union, 1), 0.0)
+
+class PersonDetector:
+    """Finds people with OpenCV's HOG pedestrian detector.
+
+    Runs on a copy downscaled to `width` and returns normalized x0, y0, x1, y1
+    boxes, strongest first, after non-maximum suppression.
+    """
+
+    def __init__(self, width=480, score_threshold=0.3, nms_threshold=0.4):
+        self.width = width
+        self.score_threshold = score_threshold
+        self.nms_threshold = nms_threshold
+        self.hog = cv2.HOGDescriptor()
+        self.hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+
+    def detect(self, frame, max_people=None):
+        if self.width and frame.shape[1] > self.width:
+            frame = resize_frame(frame, width=self.width)
+        h, w = frame.shape[:2]
+
+        rects, weights = self.hog.detectMultiScale(frame, winStride=(8, 8), padding=(8, 8), scale=1.05)
+        if len(rects) == 0:
+            return np.zeros((0, 4))
+        weights = np.asarray(weights, dtype=np.float64).ravel()
+        keep = cv2.dnn.NMSBoxes([list(map(int, r)) for r in rects], weights.tolist(),
+                                self.score_threshold, self.nms_threshold)
+        keep = np.asarray(keep, dtype=np.intp).ravel()
+        keep = keep[np.argsort(-weights[keep])][:max_people]
+
+        rects = np.asarray(rects, dtype=np.float64)[keep]
+        boxes = np.empty((len(keep), 4))
+        boxes[:, 0] = rects[:, 0] / w
+        boxes[:, 1] = rects[:, 1] / h
+        boxes[:, 2] = (rects[:, 0] + rects[:, 2]) / w
+        boxes[:, 3] = (rects[:, 1] + rects[:, 3]) / h
+        return np.clip(boxes, 0.0, 1.0)
+
+def match_boxes(tracked, detected, iou_threshold=0.3):
+    """Greedy IoU matching; returns [(tracked index, detected index)] best overlap first"""
+    if len(tracked) == 0 or len(detected) == 0:
+        return []
+    iou = box_iou(tracked, detected)
+    pairs = []
+    rows, cols = np.unravel_index(np.argsort(-iou, axis=None), iou.shape)
+    used_rows, used_cols = set(), set()
+    for r, c in zip(rows.tolist(), cols.tolist()):
+        if iou[r, c] < iou_threshold:
+            break
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        pairs.append((r, c))
+    return pairs
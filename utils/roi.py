@@ -0,0 +1,81 @@
+import numpy as np
+
+class PersonROI:
+    """Tracks a padded bounding box around the person from the previous frame's landmarks.
+
+    crop() returns the part of the frame to run inference on (the full frame
+    until a person has been found) and to_frame() maps landmarks detected in
+    that crop back to full-frame normalized coordinates.
+    """
+
+    def __init__(self, padding=0.3, min_visible=8, visibility_threshold=0.5):
+        self.padding = padding
+        self.min_visible = min_visible
+        self.visibility_threshold = visibility_threshold
+        self.box = None  # (x0, y0, x1, y1) in normalized full-frame coordinates
+        self._crop_px = None  # (x0, y0, w, h, frame_w, frame_h) of the last crop
+
+    def reset(self):
+        self.box = None
+
+    def seed(self, box):
+        """Start tracking from an externally detected normalized x0, y0, x1, y1 box"""
+        x0, y0, x1, y1 = np.clip(np.asarray(box, dtype=np.float64), 0.0, 1.0)
+        self.box = (float(x0), float(y0), float(x1), float(y1)) if x1 > x0 and y1 > y0 else None
+
+    def crop(self, frame):
+        h, w = frame.shape[:2]
+        if self.box is None:
+            self._crop_px = (0, 0, w, h, w, h)
+            return frame
+
+        x0, y0, x1, y1 = self.box
+        px0, py0 = int(x0 * w), int(y0 * h)
+        px1, py1 = int(np.ceil(x1 * w)), int(np.ceil(y1 * h))
+        self._crop_px = (px0, py0, px1 - px0, py1 - py0, w, h)
+        # A view, not a copy
+        return frame[py0:py1, px0:px1]
+
+    def to_frame(self, landmarks):
+        """Map a (33, 4) array from crop to full-frame coordinates in place"""
+        x0, y0, cw, ch, w, h = self._crop_px
+        if (cw, ch) == (w, h):
+            return landmarks
+        landmarks[:, 0] = (x0 + landmarks[:, 0] * cw) / w
+        landmarks[:, 1] = (y0 + landmarks[:, 1] * ch) / h
+        landmarks[:, 2] *= cw / w
+        return landmarks
+
+    def update(self, landmarks):
+        """Choose the crop for the next frame from full-frame landmarks (None = lost)"""
+        if landmarks is None:
+            self.box = None
+            return None
+
+        visible = landmarks[landmarks[:, 3] >= self.visibility_threshold, :2]
+        if len(visible) < self.min_visible:
+            # Tracking lost; go back to the full frame
+            self.box = None
+            return None
+
+        x0, y0 = visible.min(axis=0)
+        x1, y1 = visible.max(axis=0)
+        # Keep the current box while the person stays well inside it, so the
+        # crop (and the model's own tracking) is stable from frame to frame
+        if self.box is not None:
+            bx0, by0, bx1, by1 = self.box
+            margin_x = (bx1 - bx0) * 0.05
+            margin_y = (by1 - by0) * 0.05
+            inside = (x0 > bx0 + margin_x and y0 > by0 + margin_y and
+                      x1 < bx1 - margin_x and y1 < by1 - margin_y)
+            # ...but shrink it again once the person fills much less of it
+            snug = (x1 - x0) * (y1 - y0) > 0.35 * (bx1 - bx0) * (by1 - by0)
+            if inside and snug:
+                return self.box
+
+        pad_x = (x1 - x0) * self.padding
+        pad_y = (y1 - y0) * self.padding
+        box = (max(0.0, float(x0 - pad_x)), max(0.0, float(y0 - pad_y)),
+               min(1.0, float(x1 + pad_x)), min(1.0, float(y1 + pad_y)))
+        self.box = None if box[2] <= box[0] or box[3] <= box[1] else box
+        return self.box
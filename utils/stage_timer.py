@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+
+from config.settings import TIMING_CONFIG
+
+STAGES = ('capture', 'color', 'inference', 'drawing', 'display')
+
+class StageTimer:
+    """Rolling per-stage latencies of a running session.
+
+    Each stage keeps its last `window` (end time, duration) samples in
+    preallocated arrays, so add() is two stores and a counter bump and is
+    safe to call from the capture thread; percentiles and rates are only
+    computed in report(). Stages other than STAGES are created on first use.
+    """
+
+    def __init__(self, window=None, stages=STAGES):
+        self.window = window or TIMING_CONFIG['window']
+        self._ends = {}
+        self._durations = {}
+        self._counts = {}
+        for stage in stages:
+            self._add_stage(stage)
+
+    def _add_stage(self, stage):
+        self._ends[stage] = np.zeros(self.window, dtype=np.float64)
+        self._durations[stage] = np.zeros(self.window, dtype=np.float64)
+        self._counts[stage] = 0
+
+    def add(self, stage, duration, end=None):
+        """Record one `duration` seconds sample of stage ending at perf_counter() time `end`"""
+        if stage not in self._counts:
+            self._add_stage(stage)
+        i = self._counts[stage] % self.window
+        self._ends[stage][i] = time.perf_counter() if end is None else end
+        self._durations[stage][i] = duration
+        self._counts[stage] += 1
+
+    def since(self, stage, start):
+        """Record a sample from perf_counter() time `start` until now; returns now"""
+        end = time.perf_counter()
+        self.add(stage, end - start, end)
+        return end
+
+    def report(self):
+        """{stage: {'samples', 'fps', 'p50_ms', 'p95_ms'}} over each stage's window"""
+        report = {}
+        for stage, count in self._counts.items():
+            n = min(count, self.window)
+            if n == 0:
+                report[stage] = {'samples': 0, 'fps': 0.0, 'p50_ms': None, 'p95_ms': None}
+                continue
+            ends = self._ends[stage][:n]
+            span = ends.max() - ends.min()
+            p50, p95 = np.percentile(self._durations[stage][:n], [50, 95]) * 1000
+            report[stage] = {
+                'samples': count,
+                'fps': round((n - 1) / span, 1) if span > 0 else 0.0,
+                'p50_ms': round(float(p50), 2),
+                'p95_ms': round(float(p95), 2),
+            }
+        return report
+
+    def reset(self):
+        for stage in self._counts:
+            self._counts[stage] = 0
@@ -0,0 +1,182 @@
+import multiprocessing
+import os
+import queue
+import time
+
+import cv2
+import numpy as np
+
+from config.settings import EXERCISE_CONFIG, POSE_CONFIG, STREAMS_CONFIG, VIDEO_CONFIG
+
+def parse_source(source):
+    """Camera index for digit strings ('0', '1'), otherwise a file path or stream URL"""
+    if isinstance(source, str) and source.strip().isdigit():
+        return int(source)
+    return source
+
+def open_camera(source=None):
+    """Open a camera index, video file or stream URL; cameras get VIDEO_CONFIG's size and fps"""
+    source = parse_source(VIDEO_CONFIG['source'] if source is None else source)
+    camera = cv2.VideoCapture(source)
+    if isinstance(source, int):
+        camera.set(cv2.CAP_PROP_FRAME_WIDTH, VIDEO_CONFIG['width'])
+        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, VIDEO_CONFIG['height'])
+        camera.set(cv2.CAP_PROP_FPS, VIDEO_CONFIG['fps'])
+    return camera
+
+class StreamStats:
+    """Frame rate and latency over the last `window` frames, in preallocated arrays"""
+
+    def __init__(self, window=300):
+        self.times = np.zeros(window, dtype=np.float64)
+        self.latencies = np.zeros(window, dtype=np.float64)
+        self.count = 0
+
+    def add(self, done, latency):
+        i = self.count % len(self.times)
+        self.times[i] = done
+        self.latencies[i] = latency
+        self.count += 1
+
+    def report(self):
+        n = min(self.count, len(self.times))
+        if n == 0:
+            return {'frames': 0, 'fps': 0.0, 'latency_ms_p50': None, 'latency_ms_p95': None}
+        times = self.times[:n]
+        span = times.max() - times.min()
+        p50, p95 = np.percentile(self.latencies[:n], [50, 95]) * 1000
+        return {
+            'frames': self.count,
+            'fps': round((n - 1) / span, 1) if span > 0 else 0.0,
+            'latency_ms_p50': round(float(p50), 1),
+            'latency_ms_p95': round(float(p95), 1),
+        }
+
+def run_station(station, source, exercises, options, reports, stop_event, core=None,
+                report_interval=1.0, model_complexity=POSE_CONFIG['model_complexity']):
+    """Process entry point: count reps on one stream and put periodic reports on `reports`.
+
+    Latency is measured from the moment a frame is returned by the capture to
+    the moment its reps are counted.
+    """
+    # Imported here so the parent process never loads MediaPipe for its stations
+    from models.pose_engine import PoseEngine
+
+    if core is not None and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {core})
+        except OSError as e:
+            print(f"Error pinning station {station} to core {core}: {e}")
+    # Parallelism comes from one process per stream
+    cv2.setNumThreads(1)
+
+    report = {'station': station, 'source': str(source), 'core': core, 'error': None, 'running': True}
+    camera = open_camera(source)
+    engine = None
+    stats = StreamStats()
+    try:
+        if not camera.isOpened():
+            report['error'] = "could not open source"
+            return
+
+        engine = PoseEngine(model_complexity=model_complexity)
+        for name in exercises:
+            engine.add_exercise(name)
+
+        last_report = time.perf_counter()
+        frame = None
+        while not stop_event.is_set():
+            # Decoded into the previous frame's buffer
+            ret, frame = camera.read(frame)
+            if not ret:
+                # End of a file, or a camera that went away
+                break
+            captured = time.perf_counter()
+            engine.update(frame, active=exercises, options=options)
+            done = time.perf_counter()
+            stats.add(done, done - captured)
+
+            if done - last_report >= report_interval:
+                reports.put(dict(report, **stats.report(), counters=engine.snapshot()))
+                last_report = done
+
+    except Exception as e:
+        report['error'] = str(e)
+
+    finally:
+        camera.release()
+        report['running'] = False
+        counters = engine.snapshot() if engine is not None else {}
+        reports.put(dict(report, **stats.report(), counters=counters))
+        if engine is not None:
+            engine.close()
+
+class MultiStreamRunner:
+    """Runs one counting process per stream and collects their reports.
+
+    Each station has its own process (and so its own pose graph and counter
+    state), optionally pinned to a CPU core round-robin so stations don't
+    compete for the same core. latest() returns the newest report per station.
+    """
+
+    def __init__(self, sources, exercises=None, options=None, pin_cores=None,
+                 report_interval=None, model_complexity=None):
+        self.sources = [parse_source(s) for s in sources]
+        self.exercises = exercises
+        self.options = options or {}
+        self.pin_cores = STREAMS_CONFIG['pin_cores'] if pin_cores is None else pin_cores
+        self.report_interval = report_interval or STREAMS_CONFIG['report_interval']
+        # Same model as the rest of the app unless overridden
+        self.model_complexity = POSE_CONFIG['model_complexity'] if model_complexity is None else model_complexity
+        # Spawned, not forked: MediaPipe and OpenCV threads don't survive fork
+        self._context = multiprocessing.get_context('spawn')
+        self._reports = self._context.Queue()
+        self._stop_event = self._context.Event()
+        self._processes = []
+        self._latest = {}
+
+    def start(self):
+        exercises = list(EXERCISE_CONFIG) if self.exercises is None else self.exercises
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+
+        self._stop_event.clear()
+        for station, source in enumerate(self.sources):
+            core = cores[station % len(cores)] if self.pin_cores else None
+            process = self._context.Process(
+                target=run_station, name=f"station-{station}", daemon=True,
+                args=(station, source, exercises, self.options, self._reports, self._stop_event, core,
+                      self.report_interval, self.model_complexity))
+            process.start()
+            self._processes.append(process)
+            self._latest[station] = {'station': station, 'source': str(source), 'running': True,
+                                     'frames': 0, 'fps': 0.0, 'counters': {}, 'error': None}
+
+    def poll(self):
+        """Collect pending reports; returns latest()"""
+        while True:
+            try:
+                report = self._reports.get_nowait()
+            except queue.Empty:
+                break
+            self._latest[report['station']] = report
+        return self.latest()
+
+    def latest(self):
+        return [self._latest[station] for station in sorted(self._latest)]
+
+    def is_running(self):
+        return any(process.is_alive() for process in self._processes)
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        # Keep draining reports: a process can't exit while its queued reports are unread
+        while self.is_running() and time.monotonic() < deadline:
+            self.poll()
+            time.sleep(0.05)
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self.poll()
+        self._processes = []
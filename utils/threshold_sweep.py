@@ -0,0 +1,131 @@
+import numpy as np
+
+from models.exercise_engine import ExerciseEngine
+from utils.angles import joint_angles
+
+# Every frame budget for one vectorized batch of concatenated sessions
+BATCH_FRAMES = 1_000_000
+
+_engines = {}
+
+def _engine(exercise):
+    # Compiled single-exercise definitions, reused across sessions
+    if exercise not in _engines:
+        _engines[exercise] = ExerciseEngine([exercise])
+    return _engines[exercise]
+
+def exercise_signals(landmarks, exercise, selected_hand=None):
+    """Signed (arm, rep) signals of a (T, 33, 4) landmark sequence for one exercise.
+
+    Uses the same aggregation as the live ExerciseEngine, so the state
+    machine arms when the arm signal rises above the signed arm threshold and
+    counts a rep when the rep signal then rises above the signed rep
+    threshold (see signed_thresholds). Frames without a pose are NaN and
+    never trigger either.
+    """
+    engine = _engine(exercise)
+    plan = engine.plan([exercise], {exercise: selected_hand})
+    angles = joint_angles(landmarks, plan.triplets).reshape(landmarks.shape[:-2] + plan.shape)
+    arm, rep = engine.signals(angles, plan)
+    return arm[..., 0], rep[..., 0]
+
+def default_thresholds(exercise):
+    """The (arm, rep) angle thresholds from the exercise's definition"""
+    definition = _engine(exercise).definitions[exercise]
+    return tuple(spec.get('above', spec.get('below')) for spec in (definition['arm'], definition['rep']))
+
+def signed_thresholds(exercise, arm_thresholds, rep_thresholds):
+    """Angle thresholds in the signed space of exercise_signals"""
+    engine = _engine(exercise)
+    return (engine.arm_sign[0] * np.atleast_1d(np.asarray(arm_thresholds, dtype=np.float64)),
+            engine.rep_sign[0] * np.atleast_1d(np.asarray(rep_thresholds, dtype=np.float64)))
+
+def rep_counts(arm_signal, fire_signal, arm_thresholds, fire_thresholds, starts=None):
+    """Rep counts for every (arm, fire) signed threshold pair, without a per-frame loop.
+
+    Signals are 1-D and may hold several sessions back to back, with `starts`
+    giving the index each session begins at (the state machine is reset
+    there). Returns an int array of shape (sessions, len(arm_thresholds),
+    len(fire_thresholds)).
+
+    A frame t fires a rep exactly when fire_signal[t] is above the fire
+    threshold and the machine is armed, i.e. the latest arm event at or
+    before t is newer than the latest fire event (or session start) before
+    t. Both "latest event" indices are running maxima, so each threshold is
+    one np.maximum.accumulate over the sequence.
+    """
+    arm_signal = np.asarray(arm_signal, dtype=np.float64)
+    fire_signal = np.asarray(fire_signal, dtype=np.float64)
+    arm_thresholds = np.atleast_1d(np.asarray(arm_thresholds, dtype=np.float64))
+    fire_thresholds = np.atleast_1d(np.asarray(fire_thresholds, dtype=np.float64))
+    starts = np.array([0] if starts is None else starts, dtype=np.int64)
+
+    length = len(arm_signal)
+    counts = np.zeros((len(starts), len(arm_thresholds), len(fire_thresholds)), dtype=np.int64)
+    if length == 0:
+        return counts
+
+    index = np.arange(length)
+    # Index of the session start each frame belongs to, minus one: an arm
+    # event from an earlier session is never newer than this
+    session_floor = np.repeat(starts, np.diff(np.append(starts, length))) - 1
+
+    # (A, T) latest arm event at or before t, -1 when none yet
+    armed = arm_signal > arm_thresholds[:, None]
+    last_arm = np.maximum.accumulate(np.where(armed, index, -1), axis=1)
+
+    for j, threshold in enumerate(fire_thresholds):
+        fired = fire_signal > threshold
+        candidates = np.flatnonzero(fired)
+        if len(candidates) == 0:
+            continue
+
+        # Latest fire event strictly before each candidate frame
+        last_fire = np.maximum.accumulate(np.where(fired, index, -1))
+        previous_fire = np.empty(len(candidates), dtype=np.int64)
+        previous_fire[0] = -1
+        previous_fire[1:] = last_fire[candidates[:-1]]
+        previous_fire = np.maximum(previous_fire, session_floor[candidates])
+
+        reps = last_arm[:, candidates] > previous_fire
+        # Sum reps per session: candidates are sorted, so split them at starts
+        bounds = np.searchsorted(candidates, starts)
+        cumulative = np.concatenate((np.zeros((len(arm_thresholds), 1), dtype=np.int64),
+                                     np.cumsum(reps, axis=1)), axis=1)
+        edges = np.append(bounds, len(candidates))
+        counts[:, :, j] = (cumulative[:, edges[1:]] - cumulative[:, edges[:-1]]).T
+    return counts
+
+def sweep(sequences, exercise, arm_thresholds, fire_thresholds, selected_hand=None):
+    """Rep counts of many landmark sequences over a grid of angle thresholds.
+
+    `sequences` is an iterable of (T, 33, 4) arrays (e.g. LandmarkRecording
+    .landmarks, NaN where no pose). Sessions are concatenated into batches of
+    about BATCH_FRAMES frames so the grid is evaluated for many sessions per
+    NumPy call. Returns (sessions, arm, fire) counts.
+    """
+    arm_thresholds, fire_thresholds = signed_thresholds(exercise, arm_thresholds, fire_thresholds)
+    results = []
+    batch, batch_frames = [], 0
+
+    def flush():
+        arm_parts, fire_parts = zip(*batch)
+        lengths = [len(part) for part in arm_parts]
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        results.append(rep_counts(np.concatenate(arm_parts), np.concatenate(fire_parts),
+                                  arm_thresholds, fire_thresholds, starts))
+
+    for landmarks in sequences:
+        signals = exercise_signals(np.asarray(landmarks), exercise, selected_hand)
+        batch.append(signals)
+        batch_frames += len(signals[0])
+        if batch_frames >= BATCH_FRAMES:
+            flush()
+            batch, batch_frames = [], 0
+    if batch:
+        flush()
+
+    if not results:
+        return np.zeros((0, len(np.atleast_1d(arm_thresholds)), len(np.atleast_1d(fire_thresholds))),
+                        dtype=np.int64)
+    return np.concatenate(results)